@@ -0,0 +1,70 @@
+"""Ingestion benchmark: the typed read_bank_csv path against the old load_csv -> clean_data -> process_dates chain.
+
+Run from the repository root:  python benchmarks/bench_ingest.py [--rows N]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.generate_transactions import write_transactions  # noqa: E402
+from trackers.ingest import read_bank_csv, csv_engine  # noqa: E402
+from trackers.schema import CENTS_COLUMN, to_dollars  # noqa: E402
+
+
+def legacy_ingest(path):
+    # The chain the trackers used before the shared ingestion layer
+    df = pd.read_csv(path, header=None, names=['Date', 'Amount', 'Symbol', 'Symbol2', 'Description'])
+    df = df[['Date', 'Amount', 'Description']]
+    df['Amount'] = df['Amount'].replace(r'[^\d.-]', '', regex=True)
+    df['Amount'] = df['Amount'].replace('', pd.NA)
+    df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    return df.dropna(subset=['Date'])
+
+
+def typed_ingest(path):
+    df = read_bank_csv(path, 'Date')
+    return df.dropna(subset=['Date'])
+
+
+def best_of(func, path, repeat):
+    # Best wall time over several runs, plus the last result
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(path)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='rows in the generated export')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per method; the best is reported')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'checking.csv'
+        write_transactions('checking', args.rows, path)
+
+        legacy_time, legacy = best_of(legacy_ingest, path, args.repeat)
+        typed_time, typed = best_of(typed_ingest, path, args.repeat)
+
+    # Both paths must produce the same data
+    pd.testing.assert_series_equal(legacy['Amount'].reset_index(drop=True), to_dollars(typed[CENTS_COLUMN]).reset_index(drop=True), check_dtype=False)
+    pd.testing.assert_series_equal(legacy['Date'].reset_index(drop=True), typed['Date'].reset_index(drop=True), check_dtype=False)
+
+    print(f"rows: {args.rows:,}  engine: {csv_engine()}")
+    print(f"legacy load/clean/dates: {legacy_time:.3f} s")
+    print(f"typed read_bank_csv:     {typed_time:.3f} s")
+    print(f"speedup:                 {legacy_time / typed_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Memory benchmark: bytes per processed transaction in the compact schema against the old object/float columns.
+
+Run from the repository root:  python benchmarks/bench_memory.py [--rows N] [--account checking]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.generate_transactions import ACCOUNTS, write_transactions  # noqa: E402
+from trackers.registry import load_tracker  # noqa: E402
+from trackers.schema import CENTS_COLUMN, to_dollars  # noqa: E402
+
+
+def legacy_frame(tracker):
+    # The processed transactions with the column types the trackers used before: float dollars, strings and Periods
+    df = tracker.df
+    return pd.DataFrame({
+        tracker.date_column: df[tracker.date_column],
+        'Amount': to_dollars(df[CENTS_COLUMN]),
+        'Description': df['Description'].astype(object),
+        'Category': df['Category'].astype(object),
+        'YearMonth': df[tracker.date_column].dt.to_period('M'),
+    })
+
+
+def megabytes(df):
+    # Memory of every column, counting the Python strings behind object columns
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='rows in the generated export')
+    parser.add_argument('--account', choices=ACCOUNTS, default='checking')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f'{args.account}.csv'
+        write_transactions(args.account, args.rows, path)
+        tracker = load_tracker(args.account)(path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracker.process_data()
+
+    legacy = legacy_frame(tracker)
+    compact_mb, legacy_mb = megabytes(tracker.df), megabytes(legacy)
+    per_million = 1_000_000 / len(tracker.df)
+    print(f"rows: {len(tracker.df):,}")
+    print(f"legacy columns:  {legacy_mb:8.1f} MB  ({legacy_mb * per_million:.1f} MB per million rows)")
+    print(f"compact columns: {compact_mb:8.1f} MB  ({compact_mb * per_million:.1f} MB per million rows)")
+    print(f"saved:           {1 - compact_mb / legacy_mb:8.1%}")
+    for column in tracker.df.columns:
+        print(f"    {column:<12} {str(tracker.df[column].dtype):<16} {tracker.df[column].memory_usage(deep=True, index=False) / 1e6:8.1f} MB")
+
+    # Float sums drift with the number of rows; cent sums are exact
+    float_total = legacy['Amount'].sum()
+    cents_total = int(tracker.df[CENTS_COLUMN].sum())
+    print(f"total: ${cents_total / 100:,.2f} from cents, float sum off by {abs(float_total * 100 - cents_total):.6f} cents")
+
+
+if __name__ == "__main__":
+    main()
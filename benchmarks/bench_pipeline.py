@@ -0,0 +1,119 @@
+"""Pipeline benchmark: times every stage of a tracker's run() on synthetic exports and checks for regressions.
+
+Run from the repository root:
+    python benchmarks/bench_pipeline.py                     # 10k, 100k and 1M rows for every account
+    python benchmarks/bench_pipeline.py --sizes 10000 --check  # compare against benchmarks/baselines.json
+    python benchmarks/bench_pipeline.py --record            # store the results as the new baselines
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.generate_transactions import ACCOUNTS, write_transactions  # noqa: E402
+from trackers.registry import load_tracker  # noqa: E402
+
+BASELINES_PATH = Path(__file__).resolve().parent / 'baselines.json'
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def run_stages(tracker, trace_memory):
+    # Run every stage of tracker.run() once; return {stage: (seconds, peak MB or None)}
+    stages = tracker.pipeline_stages() + [("Displaying", tracker.display_data)]
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):  # The printed report is part of the work but not of the output
+        for label, stage in stages:
+            if trace_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            stage()
+            seconds = time.perf_counter() - start
+            peak = None
+            if trace_memory:
+                peak = tracemalloc.get_traced_memory()[1] / 1e6
+                tracemalloc.stop()
+            results[label] = (seconds, peak)
+    return results
+
+
+def benchmark(account, rows, data_dir, repeat):
+    # Best time per stage over several cold runs, plus the peak traced memory of each stage
+    path = data_dir / f'{account}_{rows}.csv'
+    if not path.exists():
+        write_transactions(account, rows, path)
+    tracker_class = load_tracker(account)
+    cache_dir = data_dir / '.tracker_cache'
+
+    timings = {}
+    for _ in range(repeat):
+        shutil.rmtree(cache_dir, ignore_errors=True)  # Every run starts without a merchant cache
+        for label, (seconds, _) in run_stages(tracker_class(path), trace_memory=False).items():
+            timings[label] = min(seconds, timings.get(label, float('inf')))
+
+    # Memory is measured in a separate run because tracing slows the stages down
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    memory = {label: peak for label, (_, peak) in run_stages(tracker_class(path), trace_memory=True).items()}
+    return {label: {'seconds': round(timings[label], 4), 'peak_mb': round(memory[label], 1)} for label in timings}
+
+
+def check_regressions(results, baselines, tolerance):
+    # Stages slower than tolerance x their baseline (and by more than 10 ms, to ignore timer noise)
+    regressions = []
+    for account, sizes in results.items():
+        for rows, stages in sizes.items():
+            for label, measured in stages.items():
+                baseline = baselines.get(account, {}).get(rows, {}).get(label)
+                if baseline and measured['seconds'] > baseline['seconds'] * tolerance and measured['seconds'] - baseline['seconds'] > 0.01:
+                    regressions.append(f"{account} {rows} rows {label}: {measured['seconds']:.3f} s vs baseline {baseline['seconds']:.3f} s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='row counts to benchmark')
+    parser.add_argument('--accounts', nargs='+', choices=ACCOUNTS, default=ACCOUNTS)
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per size; the best is kept')
+    parser.add_argument('--record', action='store_true', help=f'save the results to {BASELINES_PATH.name}')
+    parser.add_argument('--check', action='store_true', help='fail if a stage is slower than its baseline')
+    parser.add_argument('--tolerance', type=float, default=1.5, help='allowed slowdown factor for --check')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for account in args.accounts:
+            for rows in args.sizes:
+                stages = benchmark(account, rows, Path(tmp), args.repeat)
+                results.setdefault(account, {})[str(rows)] = stages
+                total = sum(stage['seconds'] for stage in stages.values())
+                print(f"\n{account}, {rows:,} rows: {total:.3f} s")
+                for label, stage in stages.items():
+                    print(f"    {label:<18} {stage['seconds']:8.3f} s  {stage['peak_mb']:8.1f} MB peak")
+
+    if args.record:
+        baselines = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+        for account, sizes in results.items():
+            baselines.setdefault(account, {}).update(sizes)
+        BASELINES_PATH.write_text(json.dumps(baselines, indent=2) + '\n')
+        print(f"\nBaselines written to {BASELINES_PATH}")
+
+    if args.check:
+        baselines = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+        regressions = check_regressions(results, baselines, args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"    {regression}")
+            sys.exit(1)
+        print("\nNo regressions against the baselines.")
+
+
+if __name__ == "__main__":
+    main()
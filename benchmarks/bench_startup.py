@@ -0,0 +1,65 @@
+"""Startup benchmark: checks that the Tk window appears without any pandas work on the import path.
+
+Run from the repository root:  python benchmarks/bench_startup.py [--runs N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Executed in a fresh interpreter so every run pays the full import cost
+STARTUP_SCRIPT = r'''
+import sys, time
+start = time.perf_counter()
+import tkinter as tk
+from gui.gui import TrackerGUI
+imported = time.perf_counter()
+try:
+    root = tk.Tk()
+except tk.TclError:
+    root = None  # No display available; only the import path can be measured
+if root is not None:
+    TrackerGUI(root)
+    root.update()  # Force the window to be drawn
+    root.destroy()
+shown = time.perf_counter()
+heavy = [name for name in ('pandas', 'numpy', 'trackers.Checking_tracker', 'trackers.Credit_tracker', 'trackers.Savings_tracker') if name in sys.modules]
+print(imported - start, shown - start, int(root is not None), ','.join(heavy))
+'''
+
+
+def measure_startup():
+    # Run the startup script once and return (import seconds, window seconds, window shown, heavy modules)
+    output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.split()
+    heavy = output[3].split(',') if len(output) > 3 else []
+    return float(output[0]), float(output[1]), output[2] == '1', heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='number of fresh interpreters to time')
+    args = parser.parse_args()
+
+    results = [measure_startup() for _ in range(args.runs)]
+    import_times = [result[0] for result in results]
+    window_times = [result[1] for result in results]
+    heavy = sorted({name for result in results for name in result[3]})
+
+    print(f"GUI import:     median {statistics.median(import_times) * 1000:.1f} ms")
+    if results[0][2]:
+        print(f"Window visible: median {statistics.median(window_times) * 1000:.1f} ms")
+    else:
+        print("Window visible: skipped (no display available)")
+
+    if heavy:
+        print(f"FAIL: imported during startup: {', '.join(heavy)}")
+        sys.exit(1)
+    print("OK: no pandas or tracker modules imported during startup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Synthetic bank exports for benchmarking, in the same 5-column quoted layout as the real CSVs.
+
+Descriptions are built from the keyword patterns in each tracker's categories, padded with the kind of
+store numbers, dates and reference numbers real exports carry, and mixed with noise that matches no rule.
+
+Run from the repository root:  python benchmarks/generate_transactions.py checking 100000 out.csv
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from trackers.categorizer import OTHER_CATEGORY  # noqa: E402
+from trackers.registry import load_tracker  # noqa: E402
+
+ACCOUNTS = ['checking', 'credit', 'savings']
+NOISE_WORDS = ['ACME', 'GLOBEX', 'INITECH', 'UMBRELLA', 'HOOLI', 'VANDELAY', 'WAYNE', 'STARK', 'PIED', 'PIPER',
+               'SOYLENT', 'TYRELL', 'CYBERDYNE', 'MASSIVE', 'DYNAMIC', 'NORTHWIND', 'CONTOSO', 'FABRIKAM']
+CITIES = ['SARASOTA FL', 'BRADENTON FL', 'TAMPA FL', 'ORLANDO FL', 'VENICE FL']
+NOISE_FRACTION = 0.15  # Share of rows whose description matches no rule
+POSITIVE_CATEGORIES = {'income', 'credit card payment'}  # Money coming into the account
+
+
+def pattern_to_text(pattern):
+    # Literal text that a keyword pattern matches, e.g. r"mcdonald\'s" -> "MCDONALD'S"
+    return re.sub(r'\\(.)', r'\1', pattern).upper()
+
+
+def merchant_samples(categories):
+    # (category, merchant text) for every keyword whose literal text really matches it
+    samples = []
+    for category, keywords in categories.items():
+        for keyword in keywords:
+            text = pattern_to_text(keyword)
+            if re.search(keyword, text.lower(), re.IGNORECASE):
+                samples.append((category, text))
+    return samples
+
+
+def noise_merchants(matcher, rng, count=200):
+    # Made-up merchant names that none of the tracker's rules match
+    names = pd.Series([f"{a} {b}" for a, b in zip(rng.choice(NOISE_WORDS, count), rng.choice(NOISE_WORDS, count))]).unique()
+    labels = matcher.categorize(pd.Series(names))
+    return names[(labels == OTHER_CATEGORY).to_numpy()]
+
+
+def generate(account, rows, seed=0, start='2015-01-01', years=10):
+    # Return a DataFrame shaped like the bank export (Date, Amount, Symbol, Symbol2, Description)
+    rng = np.random.default_rng(seed)
+    tracker = load_tracker(account)('generated.csv')
+    samples = merchant_samples(tracker.categories)
+    noise = noise_merchants(tracker.matcher, rng)
+
+    # Pick a rule-based merchant or a noise merchant for every row
+    is_noise = rng.random(rows) < NOISE_FRACTION
+    picks = rng.integers(0, len(samples), rows)
+    sample_categories = np.array([category for category, _ in samples], dtype=object)
+    sample_texts = np.array([text for _, text in samples], dtype=object)
+    merchants = np.where(is_noise, rng.choice(noise, rows), sample_texts[picks])
+    categories = np.where(is_noise, OTHER_CATEGORY, sample_categories[picks])
+
+    # Dates, newest first like the bank's exports
+    days = np.sort(rng.integers(0, 365 * years, rows))[::-1]
+    dates = pd.Timestamp(start) + pd.to_timedelta(days, unit='D')
+
+    # Noise the bank adds around merchant names: store numbers, dates, reference numbers and a city
+    store_numbers = pd.Series(rng.integers(100, 99999, rows)).astype(str)
+    references = pd.Series(rng.integers(10**11, 10**12, rows)).astype(str)
+    descriptions = (pd.Series(merchants, dtype=object) + ' #' + store_numbers + ' '
+                    + pd.Series(dates.strftime('%y%m%d')) + ' ' + references + ' '
+                    + pd.Series(rng.choice(CITIES, rows)))
+
+    # Spending is negative and income positive, with realistic long-tailed sizes
+    amounts = np.round(rng.lognormal(mean=3.0, sigma=1.0, size=rows), 2)
+    amounts = np.where(np.isin(categories, list(POSITIVE_CATEGORIES)), amounts * 20, -amounts)
+
+    return pd.DataFrame({
+        'Date': dates.strftime('%m/%d/%Y'),
+        'Amount': pd.Series(amounts).map('{:.2f}'.format),
+        'Symbol': '*',
+        'Symbol2': '',
+        'Description': descriptions,
+    })
+
+
+def write_transactions(account, rows, path, seed=0):
+    # Write a synthetic export to path with every field quoted, like the bank's CSVs
+    generate(account, rows, seed).to_csv(path, header=False, index=False, quoting=1)
+    return Path(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('account', choices=ACCOUNTS)
+    parser.add_argument('rows', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_transactions(args.account, args.rows, args.output, args.seed)
+    print(f"Wrote {args.rows:,} {args.account} transactions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
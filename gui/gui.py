@@ -1,10 +1,13 @@
 import tkinter as tk
-from tkinter import scrolledtext, filedialog
-import sys
+from tkinter import scrolledtext, filedialog, ttk
+import queue
+import threading
 from pathlib import Path
-from trackers.Checking_tracker import CheckingTracker
-from trackers.Credit_tracker import CreditTracker
-from trackers.Savings_tracker import SavingsTracker
+from gui.report_view import ReportView
+from gui.transaction_table import TransactionTable
+from trackers.registry import tracker_for_file  # Tracker modules load lazily, keeping pandas off the startup path
+
+RULES_POLL_MS = 1000  # How often the rule file of the last run is checked for edits
 
 
 class TrackerGUI:
@@ -15,13 +18,28 @@ class TrackerGUI:
         # Configure the grid
         self.master.grid_rowconfigure(0, weight=1)
         self.master.grid_rowconfigure(1, weight=0)
+        self.master.grid_rowconfigure(2, weight=0)
         self.master.grid_columnconfigure(0, weight=1)
         self.master.grid_columnconfigure(1, weight=1)
         self.master.grid_columnconfigure(2, weight=1)
+        self.master.grid_columnconfigure(3, weight=1)
+        self.master.grid_columnconfigure(4, weight=1)
         
+        # Tabs for the messages, the monthly report and the transaction table
+        self.tabs = ttk.Notebook(master)
+        self.tabs.grid(row=0, column=0, columnspan=5, pady=10, padx=10, sticky="nsew")
+
         # Text box for output
-        self.output_txt = scrolledtext.ScrolledText(master, width=70, height=20)
-        self.output_txt.grid(row=0, column=0, columnspan=3, pady=10, padx=10, sticky="nsew")
+        self.output_txt = scrolledtext.ScrolledText(self.tabs, width=70, height=20)
+        self.tabs.add(self.output_txt.frame, text="Summary")  # ScrolledText lives inside its own frame
+
+        # Monthly totals drawn from the tracker's structured report
+        self.report_view = ReportView(self.tabs)
+        self.tabs.add(self.report_view, text="Report")
+
+        # Table that only draws the visible transactions
+        self.transaction_table = TransactionTable(self.tabs)
+        self.tabs.add(self.transaction_table, text="Transactions")
 
         # Button to choose a file
         self.choose_file_btn = tk.Button(master, text="Choose File", command=self.choose_file)
@@ -31,12 +49,38 @@ class TrackerGUI:
         self.run_btn = tk.Button(master, text="Run Tracker", command=self.run_tracker)
         self.run_btn.grid(row=1, column=1, pady=10, padx=10, sticky="ew")
 
+        # Button to cancel a running tracker
+        self.cancel_btn = tk.Button(master, text="Cancel", command=self.cancel_tracker, state=tk.DISABLED)
+        self.cancel_btn.grid(row=1, column=2, pady=10, padx=10, sticky="ew")
+
         # Button to clear the output
         self.clear_btn = tk.Button(master, text="Clear Output", command=self.clear_output)
-        self.clear_btn.grid(row=1, column=2, pady=10, padx=10, sticky="ew")
+        self.clear_btn.grid(row=1, column=3, pady=10, padx=10, sticky="ew")
+
+        # Button to export the last report as JSON, CSV and HTML
+        self.export_btn = tk.Button(master, text="Export...", command=self.export_report, state=tk.DISABLED)
+        self.export_btn.grid(row=1, column=4, pady=10, padx=10, sticky="ew")
+
+        # Progress of the current run, one step per pipeline stage
+        self.progress_bar = ttk.Progressbar(master, mode="determinate")
+        self.progress_bar.grid(row=2, column=0, columnspan=2, pady=(0, 10), padx=10, sticky="ew")
+        self.status_lbl = tk.Label(master, text="Idle", anchor="w")
+        self.status_lbl.grid(row=2, column=2, pady=(0, 10), padx=10, sticky="ew")
+
+        # When checked, the run is profiled and a per-stage summary follows the report
+        self.profile_var = tk.BooleanVar(value=False)
+        self.profile_chk = tk.Checkbutton(master, text="Profile", variable=self.profile_var)
+        self.profile_chk.grid(row=2, column=3, pady=(0, 10), padx=10, sticky="w")
 
         # Variable to store the chosen file path
         self.file_path = None
+        self.tracker = None  # Tracker of the last finished run, kept for exporting
+
+        # Tracker runs happen on a worker thread; it only talks to the UI through this queue
+        self.results = queue.Queue()
+        self.worker = None
+        self.cancel_event = None
+        self.master.after(RULES_POLL_MS, self.watch_rules)
 
     def choose_file(self):
         # Open a file dialog to choose the CSV file
@@ -48,43 +92,150 @@ class TrackerGUI:
 
     def run_tracker(self):
         if self.file_path and Path(self.file_path).exists():
-            file_name = Path(self.file_path).stem
-            tracker_class = self.get_tracker_class(file_name)
-            if tracker_class:
-                tracker = tracker_class(self.file_path)
-                tracker.run()
-                # Redirect the print statements from your tracker to the text widget
-                original_stdout = sys.stdout  # Save a reference to the original standard output
-                sys.stdout = self.TextRedirector(self.output_txt)
-                tracker.display_data()
-                sys.stdout = original_stdout  # Reset the standard output to its original value
-            else:
-                self.output_txt.insert(tk.END, f"No tracker class found for file: {file_name}\n")
+            if self.worker is not None and self.worker.is_alive():
+                self.output_txt.insert(tk.END, "A tracker is already running.\n")
+                return
+            # The account is told from the file's contents on the worker thread: sniffing loads pandas and every rule file
+            self.cancel_event = threading.Event()
+            self.worker = threading.Thread(target=self.run_in_background,
+                                           args=(self.file_path, self.profile_var.get(), self.cancel_event), daemon=True)
+            self.run_btn.config(state=tk.DISABLED)
+            self.export_btn.config(state=tk.DISABLED)
+            self.cancel_btn.config(state=tk.NORMAL)
+            self.progress_bar.config(value=0)
+            self.status_lbl.config(text="Starting...")
+            self.worker.start()
+            self.master.after(100, self.poll_results)  # Check the queue without blocking the event loop
         else:
             self.output_txt.insert(tk.END, "Please select a valid CSV file or check the file path.\n")
 
-    def get_tracker_class(self, file_name):
-        # Determine the appropriate tracker class based on the file name
-        if 'checking' in file_name.lower():
-            return CheckingTracker
-        elif 'credit' in file_name.lower():
-            return CreditTracker
-        elif 'savings' in file_name.lower():
-            return SavingsTracker
-        return None
+    def run_in_background(self, file_path, profile, cancel_event):
+        # Runs on the worker thread: pick the tracker, process the file once and hand back structured results,
+        # without touching any widgets
+        from trackers.base_tracker import TrackerCancelled  # Imported here so pandas stays off the startup path
+        try:
+            self.results.put(("status", "Detecting account"))
+            try:
+                tracker_class, file_format = tracker_for_file(file_path)  # Told from the file's first few KB
+            except OSError as e:
+                self.results.put(("not an export", f"could not read {Path(file_path).name}: {e}"))
+                return
+            if tracker_class is None:
+                self.results.put(("unknown account", f"could not tell the account of {Path(file_path).name} from its name or contents"))
+                return
+            tracker = tracker_class(file_path, profile=profile, file_format=file_format)
+            tracker.process_data(progress=lambda number, count, label: self.results.put(("progress", (number, count, label))),
+                                 cancel_event=cancel_event)
+            self.results.put(("status", "Summarizing"))
+            summary = tracker.run_stage("Summarizing", tracker.report_summary)
+            tracker.run_stage("Indexing", lambda: (tracker.transaction_index(), tracker.date_range_index()))  # Built here so searching never blocks the window
+            self.results.put(("report", (summary, tracker.range_index)))
+            self.results.put(("table", (tracker.df, tracker.date_column, tracker.search_index)))
+            if tracker.profiler is not None:
+                self.results.put(("output", f"{tracker.profiler.summary()}\n"))
+            self.results.put(("done", tracker))
+        except TrackerCancelled as e:
+            self.results.put(("cancelled", str(e)))
+        except Exception as e:
+            self.results.put(("error", f"{type(e).__name__}: {e}"))
 
-    def clear_output(self):
-        self.output_txt.delete(1.0, tk.END)
+    def watch_rules(self):
+        # Runs on the Tk thread: when the last run's rule file changes on disk, re-categorize it in place on a worker thread
+        if self.tracker is not None and (self.worker is None or not self.worker.is_alive()) and self.tracker.rules_changed():
+            self.worker = threading.Thread(target=self.reload_in_background, args=(self.tracker,), daemon=True)
+            self.run_btn.config(state=tk.DISABLED)
+            self.export_btn.config(state=tk.DISABLED)
+            self.status_lbl.config(text="Reloading rules...")
+            self.worker.start()
+            self.master.after(100, self.poll_results)
+        self.master.after(RULES_POLL_MS, self.watch_rules)
+
+    def reload_in_background(self, tracker):
+        # Runs on the worker thread: new rules only re-score the affected transactions; the CSV is not read again
+        try:
+            changed = tracker.reload_rules()
+            if changed:
+                self.results.put(("report", (tracker.report_summary(), tracker.date_range_index())))
+                self.results.put(("table", (tracker.df, tracker.date_column, tracker.transaction_index())))
+            self.results.put(("reloaded", f"Rules reloaded from {tracker.rules_path.name}: {changed or 0:,} transactions changed category.\n"))
+        except Exception as e:
+            self.results.put(("error", f"{type(e).__name__}: {e}"))
+
+    def export_report(self):
+        # Ask for a folder and write the last report there as JSON, CSV and HTML on a worker thread
+        directory = filedialog.askdirectory(title="Export report to")
+        if not directory or self.tracker is None:
+            return
+        self.export_btn.config(state=tk.DISABLED)
+        self.run_btn.config(state=tk.DISABLED)
+        self.status_lbl.config(text="Exporting...")
+        self.worker = threading.Thread(target=self.export_in_background, args=(self.tracker, directory), daemon=True)
+        self.worker.start()
+        self.master.after(100, self.poll_results)
+
+    def export_in_background(self, tracker, directory):
+        # Runs on a worker thread: the writers stream the transactions straight to disk
+        try:
+            paths = tracker.export(directory)
+            self.results.put(("exported", paths))
+        except Exception as e:
+            self.results.put(("error", f"{type(e).__name__}: {e}"))
 
-    class TextRedirector:
-        def __init__(self, text_widget):
-            self.text_widget = text_widget
+    def poll_results(self):
+        # Runs on the Tk thread: apply whatever the worker has reported since the last poll
+        finished = False
+        while True:
+            try:
+                kind, payload = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                number, count, label = payload
+                self.progress_bar.config(maximum=count, value=number - 1)
+                self.status_lbl.config(text=f"{label}...")
+            elif kind == "status":
+                self.status_lbl.config(text=f"{payload}...")
+            elif kind == "output":
+                self.output_txt.insert(tk.END, payload)
+            elif kind == "report":
+                self.report_view.set_summary(*payload)
+                self.tabs.select(self.report_view)
+            elif kind == "table":
+                self.transaction_table.set_data(*payload)
+            elif kind == "done":
+                self.tracker = payload
+                self.output_txt.insert(tk.END, f"Processed {len(payload.df):,} transactions from {Path(payload.file_path).name}.\n")
+                self.progress_bar.config(value=self.progress_bar.cget("maximum"))
+                self.status_lbl.config(text="Done")
+                finished = True
+            elif kind == "reloaded":
+                self.output_txt.insert(tk.END, payload)
+                self.status_lbl.config(text="Done")
+                finished = True
+            elif kind == "exported":
+                self.output_txt.insert(tk.END, "".join(f"Exported {path}\n" for path in payload))
+                self.status_lbl.config(text="Exported")
+                finished = True
+            else:
+                self.output_txt.insert(tk.END, f"Tracker {kind}: {payload}\n")
+                self.status_lbl.config(text=kind.capitalize())
+                finished = True
+
+        if finished:
+            self.run_btn.config(state=tk.NORMAL)
+            self.cancel_btn.config(state=tk.DISABLED)
+            self.export_btn.config(state=tk.NORMAL if self.tracker is not None else tk.DISABLED)
+        else:
+            self.master.after(100, self.poll_results)
 
-        def write(self, str):
-            self.text_widget.insert(tk.END, str)
+    def cancel_tracker(self):
+        # Ask the worker to stop before its next stage
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.status_lbl.config(text="Cancelling...")
 
-        def flush(self):
-            pass
+    def clear_output(self):
+        self.output_txt.delete(1.0, tk.END)
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,85 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class ReportView(tk.Frame):
+    # Monthly report drawn from a tracker's report_summary(): one expandable row per month
+    # with its category totals underneath, so nothing has to be parsed back out of printed text.
+    # A custom date range (pay period, quarter, ...) is summed from the tracker's DateRangeIndex.
+    columns = ("Spent", "Income", "Profit", "Total", "Percentage")
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.summary = None  # Last report_summary() shown
+        self.range_index = None  # DateRangeIndex of the same transactions
+        self.range_item = None  # Tree row of the custom range, kept at the top
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # Custom date range: both ends inclusive, either one may be left empty
+        controls = tk.Frame(self)
+        controls.grid(row=0, column=0, columnspan=2, sticky="ew")
+        tk.Label(controls, text="From:").pack(side=tk.LEFT)
+        self.start_var = tk.StringVar(value="")
+        tk.Entry(controls, textvariable=self.start_var, width=12).pack(side=tk.LEFT, padx=(0, 10))
+        tk.Label(controls, text="To:").pack(side=tk.LEFT)
+        self.end_var = tk.StringVar(value="")
+        tk.Entry(controls, textvariable=self.end_var, width=12).pack(side=tk.LEFT, padx=(0, 10))
+        tk.Button(controls, text="Range totals", command=self.show_range).pack(side=tk.LEFT)
+        self.range_lbl = tk.Label(controls, text="")
+        self.range_lbl.pack(side=tk.RIGHT)
+
+        self.tree = ttk.Treeview(self, columns=self.columns)
+        self.tree.heading("#0", text="Month / Category")
+        self.tree.column("#0", width=200)
+        for column in self.columns:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=90, anchor=tk.E)
+        self.tree.grid(row=1, column=0, sticky="nsew")
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+        self.tree.config(yscrollcommand=self.scrollbar.set)
+
+    def set_summary(self, summary, range_index=None):
+        # Replace the rows with a report summary ({'months': {month: {..., 'categories': {...}}}}); with the
+        # tracker's date_range_index() the custom range controls work too
+        self.summary = summary
+        self.range_index = range_index
+        self.range_item = None
+        self.range_lbl.config(text="" if range_index is None or range_index.first_day is None
+                              else f"Data from {range_index.first_day:%Y-%m-%d} to {range_index.last_day:%Y-%m-%d}")
+        self.tree.delete(*self.tree.get_children())
+        for month, values in summary['months'].items():
+            profit = f"${values['profit']:.2f} ({values['profit_percentage']:.2f}%)"
+            item = self.tree.insert("", tk.END, text=month, open=False,
+                                    values=(f"${abs(values['spent']):.2f}", f"${values['income']:.2f}", profit, "", ""))
+            for category, row in values['categories'].items():
+                self.tree.insert(item, tk.END, text=category,
+                                 values=("", "", "", f"${row['total']:.2f}", f"{row['percentage']:.2f}%"))
+
+    def show_range(self):
+        # Sum the entered date range per category and show it as the first row
+        if self.range_index is None:
+            return
+        from trackers.aggregation import totals_in_dollars  # The tracker already loaded pandas by now
+        start, end = self.start_var.get().strip() or None, self.end_var.get().strip() or None
+        try:
+            totals = totals_in_dollars(self.range_index.category_totals(start, end))
+        except ValueError as e:
+            self.range_lbl.config(text=f"Invalid date: {e}")
+            return
+        column = self.summary['column']
+        shown = totals[totals['spent_count' if column == 'spent' else 'count'] > 0]
+        spent, income = totals['spent'].sum(), totals['income'].sum()
+        profit = income + spent
+        profit_percentage = profit / income * 100 if income else 0.0
+        percentages = shown[column] / (spent if column == 'spent' else abs(spent)) * 100 if spent else shown[column] * 0.0
+
+        if self.range_item is not None:
+            self.tree.delete(self.range_item)
+        self.range_item = self.tree.insert("", 0, text=f"{start or 'first'} to {end or 'last'}", open=True,
+                                           values=(f"${abs(spent):.2f}", f"${income:.2f}", f"${profit:.2f} ({profit_percentage:.2f}%)", "", ""))
+        for category, total, percentage in sorted(zip(shown.index, shown[column], percentages), key=lambda row: -row[2]):
+            self.tree.insert(self.range_item, tk.END, text=category,
+                             values=("", "", "", f"${total:.2f}", f"{percentage:.2f}%"))
+        self.range_lbl.config(text=f"{int(totals['count'].sum()):,} transactions in range")
@@ -0,0 +1,159 @@
+import tkinter as tk
+from tkinter import ttk
+
+ALL = "All"  # Filter value that matches every month or category
+
+
+class TransactionTable(tk.Frame):
+    # Table of processed transactions that only creates Treeview rows for the visible window,
+    # so scrolling, filtering and sorting stay fast however many transactions there are
+    columns = ("Date", "Amount", "Description", "Category")
+
+    def __init__(self, master, visible_rows=20, **kwargs):
+        super().__init__(master, **kwargs)
+        self.visible_rows = visible_rows  # Rows drawn at once, however many transactions there are
+        self.df = None  # Processed DataFrame; never copied
+        self.date_column = None
+        self.index = None  # TransactionIndex over df; every filter and search goes through it
+        self.amounts = None  # Dollar amount of every row, converted once from the cents column
+        self.positions = None  # Row positions in df that pass the filters, in display order
+        self.offset = 0  # Position in self.positions of the first visible row
+        self.sort_column = None
+        self.sort_ascending = True
+
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # Month and category filters
+        filters = tk.Frame(self)
+        filters.grid(row=0, column=0, columnspan=2, sticky="ew")
+        tk.Label(filters, text="Month:").pack(side=tk.LEFT)
+        self.month_var = tk.StringVar(value=ALL)
+        self.month_box = ttk.Combobox(filters, textvariable=self.month_var, state="readonly", width=10, values=[ALL])
+        self.month_box.pack(side=tk.LEFT, padx=(0, 10))
+        tk.Label(filters, text="Category:").pack(side=tk.LEFT)
+        self.category_var = tk.StringVar(value=ALL)
+        self.category_box = ttk.Combobox(filters, textvariable=self.category_var, state="readonly", width=20, values=[ALL])
+        self.category_box.pack(side=tk.LEFT, padx=(0, 10))
+        tk.Label(filters, text="Search:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar(value="")
+        self.search_entry = tk.Entry(filters, textvariable=self.search_var, width=30)
+        self.search_entry.pack(side=tk.LEFT)
+        self.search_var.trace_add("write", lambda *args: self.apply_filters())  # Results follow every keystroke
+        self.count_lbl = tk.Label(filters, text="")
+        self.count_lbl.pack(side=tk.RIGHT)
+        self.month_box.bind("<<ComboboxSelected>>", lambda event: self.apply_filters())
+        self.category_box.bind("<<ComboboxSelected>>", lambda event: self.apply_filters())
+
+        # The Treeview only holds visible_rows items; the scrollbar moves a window over self.positions
+        self.tree = ttk.Treeview(self, columns=self.columns, show="headings", height=visible_rows)
+        for column in self.columns:
+            self.tree.heading(column, text=column, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=400 if column == "Description" else 100, anchor=tk.E if column == "Amount" else tk.W)
+        self.tree.grid(row=1, column=0, sticky="nsew")
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll_rows(-1 if event.delta > 0 else 1) or "break")
+        self.tree.bind("<Button-4>", lambda event: self.scroll_rows(-1) or "break")  # Mouse wheel on X11
+        self.tree.bind("<Button-5>", lambda event: self.scroll_rows(1) or "break")
+
+    def set_data(self, df, date_column, index=None):
+        # Show a processed tracker DataFrame (with YearMonth and Category columns); pass the tracker's
+        # transaction_index() when it was already built off the Tk thread
+        from trackers.schema import CENTS_COLUMN, to_dollars  # The tracker already loaded pandas by now
+        from trackers.search import TransactionIndex
+        self.df = None  # Keeps the variable traces below from filtering the old data
+        self.month_var.set(ALL)
+        self.category_var.set(ALL)
+        self.search_var.set("")
+        self.df = df
+        self.date_column = date_column
+        self.sort_column = None
+        self.amounts = to_dollars(df[CENTS_COLUMN]).to_numpy()
+        self.index = index if index is not None else TransactionIndex(df, date_column)
+        self.month_box.config(values=[ALL] + [str(month) for month in df['YearMonth'].cat.categories])
+        self.category_box.config(values=[ALL] + sorted(df['Category'].unique()))
+        self.apply_filters()
+
+    def apply_filters(self):
+        # Recompute which rows are shown from the month and category filters and the search text, keeping the current sort
+        if self.df is None:
+            return
+        filters = {}
+        if self.month_var.get() != ALL:
+            filters['month'] = self.month_var.get()
+        if self.category_var.get() != ALL:
+            filters['category'] = self.category_var.get()
+        try:
+            positions = self.index.query(self.search_var.get(), **filters)
+        except ValueError as e:
+            self.count_lbl.config(text=f"Invalid search: {e}")  # e.g. a from: date that does not parse; keep the last results
+            return
+        self.positions = positions
+        if self.sort_column is not None:
+            self.positions = self.sorted_positions(self.positions)
+        self.offset = 0
+        self.render()
+
+    def column_values(self, column):
+        # Underlying values for a table column
+        if column == "Amount":
+            return self.amounts
+        return self.df[self.date_column if column == "Date" else column].to_numpy()
+
+    def sorted_positions(self, positions):
+        # Order row positions by the sort column with a stable sort
+        values = self.column_values(self.sort_column)[positions]
+        order = values.argsort(kind="stable")
+        if not self.sort_ascending:
+            order = order[::-1]
+        return positions[order]
+
+    def sort_by(self, column):
+        # Clicking a heading sorts by it; clicking it again reverses the order
+        if self.df is None:
+            return
+        self.sort_ascending = not self.sort_ascending if self.sort_column == column else True
+        self.sort_column = column
+        for name in self.columns:
+            arrow = (" ▲" if self.sort_ascending else " ▼") if name == column else ""
+            self.tree.heading(name, text=name + arrow)
+        self.positions = self.sorted_positions(self.positions)
+        self.render()
+
+    def yview(self, *args):
+        # Scrollbar callback: ('moveto', fraction) or ('scroll', n, 'units'/'pages')
+        if self.positions is None:
+            return
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.positions))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.offset += int(args[1]) * step
+        self.render()
+
+    def scroll_rows(self, rows):
+        self.yview("scroll", rows, "units")
+
+    def render(self):
+        # Replace the Treeview items with the rows in the current window
+        total = len(self.positions)
+        self.offset = max(0, min(self.offset, total - self.visible_rows))
+        window = self.positions[self.offset:self.offset + self.visible_rows]
+
+        self.tree.delete(*self.tree.get_children())
+        dates = self.df[self.date_column]
+        for position in window:
+            self.tree.insert("", tk.END, values=(
+                dates.iat[position].strftime("%Y-%m-%d"),
+                f"{self.amounts[position]:.2f}",
+                self.df['Description'].iat[position],
+                self.df['Category'].iat[position],
+            ))
+
+        # Size the scrollbar thumb to the visible fraction of the filtered rows
+        if total:
+            self.scrollbar.set(self.offset / total, (self.offset + len(window)) / total)
+        else:
+            self.scrollbar.set(0, 1)
+        self.count_lbl.config(text=f"{total:,} of {len(self.df):,} transactions")
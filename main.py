@@ -1,7 +1,26 @@
-from gui.gui import TrackerGUI
+import argparse
 import tkinter as tk
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = TrackerGUI(root)
-    root.mainloop()
+    parser = argparse.ArgumentParser(description="Account tracker. Opens the GUI unless --batch or --watch is given.")
+    parser.add_argument("--batch", nargs="+", metavar="PATH", help="directories, globs or CSV files to process without the GUI")
+    parser.add_argument("--watch", metavar="DIR", help="watch DIR and process every new or changed CSV export as it lands, without the GUI")
+    parser.add_argument("--settle", type=float, default=2.0, help="in watch mode, seconds a file must stop changing before it is read (default: 2)")
+    parser.add_argument("--output", default="report.csv", help="consolidated report written in batch and watch mode (default: report.csv)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes in batch and watch mode (default: one per CPU core)")
+    parser.add_argument("--profile", metavar="JSON", help="in batch mode, write per-stage timings, row counts and memory of every file to this JSON file")
+    parser.add_argument("--transfer-days", type=int, default=5, help="in batch mode, days apart a transfer's two sides may post (default: 5)")
+    parser.add_argument("--export", metavar="DIR", help="in batch and watch mode, also export every file's report to DIR as JSON, CSV and HTML")
+    args = parser.parse_args()
+
+    if args.batch:
+        from trackers.batch import run_batch
+        run_batch(args.batch, args.output, args.workers, args.profile, args.transfer_days, args.export)
+    elif args.watch:
+        from trackers.watch import InboxWatcher
+        InboxWatcher(args.watch, args.workers, args.settle, args.export).run(args.output)
+    else:
+        from gui.gui import TrackerGUI
+        root = tk.Tk()
+        app = TrackerGUI(root)
+        root.mainloop()
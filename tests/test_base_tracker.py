@@ -0,0 +1,31 @@
+"""Regression tests for re-categorizing a tracker's transactions after its rows change."""
+
+import contextlib
+import io
+from trackers.Checking_tracker import CheckingTracker
+
+CATEGORIES = {'food': ['publix'], 'gas': ['shell'], 'other': []}
+
+
+def write(path, descriptions):
+    path.write_text(''.join(f'"01/{day:02d}/2024","-10.00","*","","{description}"\n'
+                            for day, description in enumerate(descriptions, start=1)))
+
+
+def categories(tracker):
+    return tracker.df.sort_index()['Category'].astype(str).tolist()
+
+
+def test_rule_edit_after_reprocessing_uses_the_new_rows(tmp_path):
+    path = tmp_path / 'checking.csv'
+    write(path, ['PUBLIX 1234', 'SHELL OIL 5784', 'TARGET 99'])
+    tracker = CheckingTracker(str(path), categories=CATEGORIES)
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracker.process_data()
+        tracker.update_categories({**CATEGORIES, 'shopping': ['target']})  # Builds the rule index
+        # Same number of rows, so the same row labels, but different descriptions
+        write(path, ['TARGET 99', 'PUBLIX 1234', 'SHELL OIL 5784'])
+        tracker.process_data()
+        changed = tracker.update_categories({**CATEGORIES, 'shopping': ['target'], 'gas': ['shell', 'wawa']})
+    assert categories(tracker) == ['shopping', 'food', 'gas']
+    assert changed == 0
@@ -0,0 +1,26 @@
+"""Regression tests for date range totals."""
+
+import pandas as pd
+import pytest
+from trackers.date_index import DateRangeIndex
+
+
+def index():
+    df = pd.DataFrame({
+        'Date': pd.to_datetime(['2024-01-05', '2024-02-10', '2024-02-10', '2024-03-31']),
+        'AmountCents': pd.array([-500, -1200, 3000, -45], dtype='Int64'),
+        'Category': pd.Categorical(['food', 'gas', 'income', 'food']),
+    })
+    return DateRangeIndex(df, 'Date')
+
+
+def test_reversed_range_is_rejected():
+    with pytest.raises(ValueError, match='after'):
+        index().category_totals('2024-03-01', '2024-02-01')
+
+
+def test_single_day_and_open_ranges():
+    totals = index().category_totals('2024-02-10', '2024-02-10')
+    assert totals['net'].to_dict() == {'food': 0, 'gas': -1200, 'income': 3000}
+    assert index().totals(end='2024-02-09')['net'] == -500
+    assert index().totals(start='2024-02-11')['net'] == -45
@@ -0,0 +1,36 @@
+"""Regression tests for the JSON report export."""
+
+import json
+import math
+import pandas as pd
+from trackers.export import JsonWriter, plain_numbers
+
+
+def strict_loads(text):
+    # json.loads, but failing on the NaN/Infinity constants Python accepts and real JSON parsers do not
+    def reject(name):
+        raise ValueError(f"{name} is not valid JSON")
+    return json.loads(text, parse_constant=reject)
+
+
+def summary():
+    month = {'spent': -120.0, 'income': 0.0, 'profit': -120.0, 'profit_percentage': -math.inf,
+             'categories': {'food': {'total': -120.0, 'percentage': math.nan}, 'gas': {'total': 0.0, 'percentage': math.inf}}}
+    return {'account': 'Checking', 'file': 'checking.csv', 'column': 'spent', 'months': {'2024-01': month}}
+
+
+def test_non_finite_values_become_null():
+    month = plain_numbers(summary())['months']['2024-01']
+    assert month['profit_percentage'] is None
+    assert month['categories']['food']['percentage'] is None
+    assert month['categories']['gas'] == {'total': 0.0, 'percentage': None}
+    assert month['spent'] == -120.0
+
+
+def test_json_export_is_valid_json(tmp_path):
+    path = tmp_path / 'report.json'
+    with JsonWriter(path, summary()) as writer:
+        writer.write_rows(pd.DataFrame({'Date': ['01/05/2024'], 'Amount': [-120.0], 'Description': ['PUBLIX'], 'Category': ['food']}))
+    report = strict_loads(path.read_text(encoding='utf-8'))
+    assert report['months']['2024-01']['profit_percentage'] is None
+    assert report['transactions'] == [{'Date': '01/05/2024', 'Amount': -120.0, 'Description': 'PUBLIX', 'Category': 'food'}]
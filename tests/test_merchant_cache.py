@@ -0,0 +1,52 @@
+"""Regression tests for the merchant category cache: shared merchant keys must not hide store-number keywords."""
+
+import contextlib
+import io
+import pandas as pd
+from trackers.Credit_tracker import CreditTracker
+from trackers.categorizer import CategoryMatcher
+from trackers.merchant_cache import CategoryCache
+from trackers.rules import load_rules, rules_file
+
+# Same merchant key ('target sarasota fl'); only the store number matches the 'target 00020347 sarasota fl' food keyword
+OTHER_STORE = 'TARGET 00099999 SARASOTA FL'
+FOOD_STORE = 'TARGET 00020347 SARASOTA FL'
+
+
+def categorize(tmp_path, descriptions):
+    matcher = CategoryMatcher(load_rules(rules_file('credit')))
+    cache = CategoryCache(tmp_path / 'cache.json', matcher.rules_hash)
+    return [cache.categorize(matcher, pd.Series([description])).iloc[0] for description in descriptions]
+
+
+def test_store_number_keyword_is_not_shared_across_merchant_key(tmp_path):
+    assert categorize(tmp_path, [OTHER_STORE, FOOD_STORE]) == ['other', 'food']
+    assert categorize(tmp_path / 'reverse', [FOOD_STORE, OTHER_STORE]) == ['food', 'other']
+
+
+def test_streaming_totals_match_full_run(tmp_path):
+    # Each run gets its own directory, and so its own cache file: the streaming run must get it right from scratch
+    rows = (f'"01/05/2024","-10.00","*","","{OTHER_STORE}"\n'
+            f'"01/06/2024","-25.00","*","","{FOOD_STORE}"\n'
+            f'"01/07/2024","-5.00","*","","{OTHER_STORE}"\n')
+    for run in ('full', 'streamed'):
+        (tmp_path / run).mkdir()
+        (tmp_path / run / 'credit.csv').write_text(rows)
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracker = CreditTracker(str(tmp_path / 'full' / 'credit.csv'))
+        tracker.process_data()
+        streamed = CreditTracker(str(tmp_path / 'streamed' / 'credit.csv')).run_streaming(chunksize=1)
+    full = tracker.report.totals.droplevel('YearMonth')['spent']
+    assert full.loc['food'] == -2500 and full.loc['other'] == -1500
+    assert streamed.totals.droplevel('YearMonth')['spent'].to_dict() == full.to_dict()
+
+
+def test_multi_word_keyword_is_not_shared_across_merchant_key(tmp_path):
+    # Stripping the store number brings the words of 'shell oil' and 'taco bell' together in the merchant key
+    matcher = CategoryMatcher(load_rules(rules_file('credit')))
+    for matched, split, name in [('SHELL OIL 5784 TAMPA', 'SHELL 5784 OIL TAMPA', 'shell'),
+                                 ('TACO BELL #24542', 'TACO #24542 BELL', 'taco')]:
+        category = matcher.categorize_one(matched)
+        assert category != 'other' and matcher.categorize_one(split) == 'other'
+        assert categorize(tmp_path / name, [matched, split]) == [category, 'other']
+        assert categorize(tmp_path / f'{name}_reverse', [split, matched]) == ['other', category]
@@ -0,0 +1,24 @@
+"""Regression tests for recurring charge detection."""
+
+import pandas as pd
+from trackers.recurring import detect_recurring
+
+
+def frame(dates, cents, descriptions):
+    return pd.DataFrame({'Date': pd.to_datetime(dates), 'AmountCents': pd.array(cents, dtype='Int64'),
+                         'Description': descriptions, 'Category': pd.Categorical(['other'] * len(dates))})
+
+
+def test_extra_charges_between_billed_ones_still_recur():
+    # Monthly charges with a few one-off purchases at the same price in between: only billing_chain finds these
+    billed = pd.date_range('2023-01-09', periods=12, freq='MS') + pd.Timedelta(days=8)
+    extra = pd.to_datetime(['2023-02-27', '2023-05-27', '2023-08-27', '2023-11-27'])
+    dates = list(billed) + list(extra)
+    found = detect_recurring(frame(dates, [-1599] * len(dates), ['NETFLIX.COM 866-579-7172 CA'] * len(dates)), 'Date')
+    assert found['merchant'].tolist() == ['netflix.com - - ca']
+    assert found['occurrences'].iloc[0] >= 12
+
+
+def test_no_charges():
+    assert detect_recurring(frame(['2024-01-01'], [500], ['PAYROLL']), 'Date').empty
+    assert detect_recurring(frame([], [], []), 'Date').empty
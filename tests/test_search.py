@@ -0,0 +1,38 @@
+"""Regression tests for the transaction search index's date filters."""
+
+import numpy as np
+import pandas as pd
+from trackers.search import TransactionIndex
+
+DATES = pd.to_datetime(['2024-01-05', '2024-02-10', '2024-03-31', '2024-04-02', None, '2023-12-31'])
+
+
+def index():
+    df = pd.DataFrame({
+        'Date': DATES,
+        'AmountCents': pd.array([-500, -1200, 3000, -45, -700, -100], dtype='Int64'),
+        'Description': ['TARGET', 'SHELL OIL', 'PAYROLL', 'STARBUCKS', 'TARGET', 'PUBLIX'],
+        'Category': pd.Categorical(['food', 'gas', 'income', 'food', 'food', 'food']),
+    })
+    return TransactionIndex(df, 'Date')
+
+
+def expected(start=None, end=None):
+    # Brute-force filter: bare end dates include the whole day, missing dates never match
+    mask = DATES.notna()
+    if start is not None:
+        mask &= DATES >= pd.Timestamp(start)
+    if end is not None:
+        mask &= DATES < pd.Timestamp(end) + pd.Timedelta(days=1)
+    return list(np.flatnonzero(mask))
+
+
+def test_end_only_filter():
+    assert list(index().search(end='2024-03-31')) == expected(end='2024-03-31') == [0, 1, 2, 5]
+    assert list(index().query('to:2024-01-31')) == expected(end='2024-01-31') == [0, 5]
+
+
+def test_start_only_and_both_bounds():
+    assert list(index().search(start='2024-02-01')) == expected(start='2024-02-01')
+    assert list(index().search(start='2024-01-01', end='2024-03-31')) == expected('2024-01-01', '2024-03-31')
+    assert list(index().search(start='2024-05-01')) == []
@@ -0,0 +1,40 @@
+"""Regression tests for sniffing the decimal separator of statement amounts."""
+
+import pandas as pd
+import pytest
+from trackers.ingest import read_bank_csv, read_bank_csv_chunks
+from trackers.schema import CENTS_COLUMN
+from trackers.sniff import sniff_layout
+
+COMMA_ROWS = ['Date;Amount;Description', '11.12.2023;-10,00;TARGET SARASOTA', '12.12.2023;-8,45;SHELL OIL 5784',
+              '15.12.2023;1.234,56;PAYROLL ACME', '18.12.2023;-1.050,00;RENT']
+
+
+def write(tmp_path, lines, name='export.csv'):
+    path = tmp_path / name
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+
+def test_decimal_comma_is_sniffed_and_read(tmp_path):
+    path = write(tmp_path, COMMA_ROWS)
+    file_format, _ = sniff_layout(path)
+    assert (file_format.delimiter, file_format.header, file_format.decimal) == (';', True, ',')
+    expected = [-1000, -845, 123456, -105000]
+    assert read_bank_csv(path, file_format=file_format)[CENTS_COLUMN].tolist() == expected
+    chunks = pd.concat(read_bank_csv_chunks(path, chunksize=2, file_format=file_format))
+    assert chunks[CENTS_COLUMN].tolist() == expected
+
+
+def test_decimal_point_is_sniffed_and_read(tmp_path):
+    path = write(tmp_path, ['"12/11/2023","-10.00","*","","TARGET"', '"12/12/2023","-8.45","*","","SHELL OIL"',
+                            '"12/15/2023","1,234.56","*","","PAYROLL"'])
+    file_format, _ = sniff_layout(path)
+    assert file_format.decimal == '.'
+    assert read_bank_csv(path, file_format=file_format)[CENTS_COLUMN].tolist() == [-1000, -845, 123456]
+
+
+def test_mixed_decimal_separators_are_rejected(tmp_path):
+    path = write(tmp_path, COMMA_ROWS + ['19.12.2023;-5.25;STARBUCKS'])
+    with pytest.raises(ValueError, match='decimal'):
+        sniff_layout(path)
@@ -1,148 +1,56 @@
 """ this will keep track fo the net income/payments of the user's savings account and display them
 """
 
+import sys
 import pandas as pd
-import re
-
-class SavingsTracker:
-    def __init__(self, file_path):
-        self.file_path = file_path  # Path to the CSV file containing the savings data
-        self.df = None  # DataFrame to store the savings data
-        # Dictionary to categorize transactions based on keywords in the description
-        self.categories = {
-        'income': [
-                r'TARGET CORPORATI PAYROLL', 
-                r'eDeposit in Branch',
-                r'INTEREST PAYMENT', r'ONLINE TRANSFER FROM DRUMMOND D', r'interest'
-            ],
-            'payments': [
-                r'FID BKG SVC LLC MONEYLINE',
-                r'WF Credit Card AUTO PAY', 
-                r'CRUNCH CLUB FEES',
-                r'ONLINE TRANSFER REF #IB',
-                r'ZELLE TO',
-                r'PRIZEPICKS INTERNET',
-                r'ONLINE TRANSFER TO DRUMMOND D',
-                r'ONLINE TRANSFER TO DRUMMOND D'
-            ]
-}
-
-    def load_csv(self):
-        # Try to load the CSV file into a DataFrame
-        try:
-            self.df = pd.read_csv(self.file_path, header=None, names=['Date y/m/d', 'Amount', 'Symbol', 'Symbol2', 'Description'])
-            print("CSV file loaded successfully.")
-        except Exception as e:
-            # If there's an error, print it
-            print(f"Error loading CSV file: {e}")
-
-
-    def clean_data(self):
-        # Keep only relevant columns
-        self.df = self.df[['Date y/m/d', 'Amount', 'Description']]
-        # Remove any non-numeric characters from the Amount column and convert to numeric
-        self.df['Amount'] = self.df['Amount'].replace('[^\d.-]', '', regex=True)  # Use regex to remove unwanted characters
-        self.df['Amount'] = self.df['Amount'].replace('', pd.NA)  # Replace empty strings with NaN
-        self.df['Amount'] = pd.to_numeric(self.df['Amount'], errors='coerce')  # Convert to numeric, setting invalid parsing as NaN
-
-
-    def categorize_transaction(self, description):
-        description = description.lower()  # Convert description to lowercase for case-insensitive matching
-        category_scores = {category: 0 for category in self.categories}  # Initialize scores for each category
-
-        for category, keywords in self.categories.items():
-            for keyword in keywords:
-                if re.search(keyword, description, re.IGNORECASE):  # Use regex to search for the keyword in the description
-                    category_scores[category] += 1  # Increment the score for the matched category
-
-        # Determine the category with the highest score
-        best_category = max(category_scores, key=category_scores.get)
-        return best_category if category_scores[best_category] > 0 else 'other'  # Return 'other' if no category has a positive score
-
-
-    def apply_categorization(self):
-        # Apply categorization to each transaction based on the description
-        self.df['Category'] = self.df['Description'].apply(lambda x: self.categorize_transaction(x))  # Use apply to run categorize_transaction on each description
+from pathlib import Path
+from trackers.base_tracker import BaseTracker
 
+class SavingsTracker(BaseTracker):
+    date_column = 'Date y/m/d'  # Name of the date column in this account's export
+    account = 'savings'  # Short account name used for cache files and its rules/savings.json
+    report_column = 'net'  # Savings reports every category with transactions, not just spending
 
     def process_dates(self):
-        # Convert the date column to datetime format
-        self.df['Date y/m/d'] = pd.to_datetime(self.df['Date y/m/d'], errors='coerce')  # Convert to datetime, coercing errors to NaT
-        # Drop any rows with invalid dates
-        self.df = self.df.dropna(subset=['Date y/m/d'])  # Drop rows where 'Date y/m/d' is NaT
+        super().process_dates()  # Convert the date column and drop invalid dates
         # Verify the conversion
         print("\nDate conversion complete. Data types:\n", self.df.dtypes)
 
 
-    def sort_data(self):
-        # Sort the DataFrame by date and category
-        self.df = self.df.sort_values(by=['Date y/m/d', 'Category'])  # Sort by date and then by category
-    
-    
     def display_data(self):
         # Set display options for better readability
         pd.set_option('display.max_rows', None)
         pd.set_option('display.max_columns', None)
         pd.set_option('display.width', None)
         pd.set_option('display.max_colwidth', None)
-        
+
+        self.display_sorted_monthly_transactions()
+        self.display_monthly_category_totals()  # Display monthly category totals
+
     def display_sorted_monthly_transactions(self):
-        self.df['YearMonth'] = self.df['Date y/m/d'].dt.to_period('M')  # Extract YearMonth period from date
-        grouped = self.df.groupby('YearMonth')  # Group the DataFrame by YearMonth
+        # Sort once by month, category and date, then print each month (YearMonth was added when the report was built)
+        sorted_df = self.df.sort_values(by=['YearMonth', 'Category', 'Date y/m/d'])
 
-        for name, group in grouped:
+        for name, group in sorted_df.groupby('YearMonth', observed=True):
             print(f"\nTransactions for {name}:\n")
-            sorted_group = group.sort_values(by=['Category', 'Date y/m/d'])  # Sort within each month by category and date
-            print(sorted_group[['Date y/m/d', 'Amount', 'Description', 'Category']])
+            print(self.transactions_view(group))  # Amounts back in dollars for printing
 
     
-    def display_monthly_category_totals(self):
-        self.df['YearMonth'] = self.df['Date y/m/d'].dt.to_period('M')  # Extract YearMonth period from date
-        grouped = self.df.groupby('YearMonth')  # Group the DataFrame by YearMonth
+    def display_monthly_category_totals(self, report=None):
+        if report is None:
+            report = self.report  # MonthlyReport built while processing the data
+        category_rows = report.category_rows(self.report_column)  # Every category with transactions, sorted by percentage
 
-        for name, group in grouped:
-            total_income = group[group['Amount'] > 0]['Amount'].sum()  # Calculate total income for the month
-            total_spent = group[group['Amount'] < 0]['Amount'].sum()  # Calculate total expenses for the month (negative values)
-            profit = total_income + total_spent  # Calculate profit for the month
-            profit_percentage = (profit / total_income) * 100 if total_income != 0 else 0  # Calculate profit percentage
+        for name, month in zip(report.months.index, report.months.itertuples()):
+            print(f"\nTotal in {name}: ${month.income:.2f} ({month.profit_percentage:.2f}% profit)")  # Print total for the month
 
-            print(f"\nTotal in {name}: ${total_income:.2f} ({profit_percentage:.2f}% profit)")  # Print total for the month
-            
-            category_totals = group.groupby('Category')['Amount'].sum()  # Calculate total per category for the month
-            # Calculate percentage per category for the month
-            total_spent_absolute = abs(total_spent)  # Use absolute value for calculating percentages
-            category_percentages = (category_totals / total_spent_absolute) * 100
-            
-            # Combine totals and percentages into a DataFrame for sorting
-            category_stats = pd.DataFrame({
-                'Total': category_totals,
-                'Percentage': category_percentages
-            })
-            
-            # Sort the categories by percentage in descending order
-            category_stats = category_stats.sort_values(by='Percentage', ascending=False)
-            
             # Print the totals and percentages for each category for the month
-            for category, stats in category_stats.iterrows():
-                total = stats['Total']
-                percentage = stats['Percentage']
+            for category, total, percentage in category_rows.get(name, []):
                 print(f"    - {category}: ${total:.2f} ({percentage:.2f}%)")  # Indent for readability and add percentage
 
 
-    def run(self):
-        """
-        Run all methods to process and display the savings data.
-        """
-        self.load_csv()  # Load the CSV file
-        self.clean_data()  # Clean the data
-        self.apply_categorization()  # Categorize the data
-        self.process_dates()  # Convert and validate the date format
-        self.sort_data()  # Sort the data by date and category
-        self.display_data()  # Display the cleaned and categorized data
-        self.display_sorted_monthly_transactions()
-        self.display_monthly_category_totals()  # Display monthly category totals
-
-
-saving_csv_file_path = "/Users/drewdrummond/Documents/coding projects/Python_expense_tracker/CSV's/saving.csv"
-tracker = SavingsTracker(saving_csv_file_path)
-tracker.run()
\ No newline at end of file
+if __name__ == "__main__":
+    # Instantiate and run the SavingsTracker (python -m trackers.Savings_tracker [path/to/file.csv])
+    saving_csv_file_path = sys.argv[1] if len(sys.argv) > 1 else Path(__file__).resolve().parent.parent / "CSV's" / "saving.csv"
+    tracker = SavingsTracker(saving_csv_file_path)
+    tracker.run()
@@ -0,0 +1,110 @@
+"""Monthly per-category totals, computed from a whole DataFrame or folded in chunk by chunk, and the report built from them."""
+
+import pandas as pd
+from trackers.schema import CENTS_COLUMN, MONEY_COLUMNS
+
+# Columns of a monthly totals table, indexed by (YearMonth, Category); spent, income and net are in cents
+TOTAL_COLUMNS = ['spent', 'income', 'net', 'spent_count', 'count']
+
+
+def empty_totals():
+    # Totals table with no months in it
+    index = pd.MultiIndex.from_arrays([pd.PeriodIndex([], freq='M'), pd.Index([], dtype=object)], names=['YearMonth', 'Category'])
+    return pd.DataFrame({column: pd.Series(dtype='int64') for column in TOTAL_COLUMNS}, index=index)
+
+
+def plain_level(level):
+    # Categorical index level -> index of its actual values (Periods or category names)
+    return level.astype(level.categories.dtype) if isinstance(level, pd.CategoricalIndex) else level
+
+
+def monthly_category_totals(df, date_column):
+    # Sum negative amounts (spent), positive amounts (income) and all amounts (net) per month and category,
+    # in integer cents so the totals are exact; missing amounts count as zero
+    cents = df[CENTS_COLUMN].fillna(0).to_numpy(dtype='int64')
+    frame = pd.DataFrame({
+        'spent': cents.clip(max=0),
+        'income': cents.clip(min=0),
+        'net': cents,
+        'spent_count': (cents < 0).astype('int64'),  # Categories only show up in spending totals if they spent something
+        'count': 1,
+    }, index=df.index)
+    months = df['YearMonth'] if 'YearMonth' in df else df[date_column].dt.to_period('M')  # Reuse the month column when it exists
+    keys = [months.rename('YearMonth'), df['Category'].rename('Category')]
+    totals = frame.groupby(keys, observed=True).sum()
+    # Categorical keys give categorical index levels; the totals table is small, so store plain values
+    totals.index = pd.MultiIndex.from_arrays([plain_level(totals.index.get_level_values(name)) for name in totals.index.names],
+                                             names=totals.index.names)
+    return totals
+
+
+def totals_in_dollars(totals, columns=MONEY_COLUMNS):
+    # Copy of a totals table with the money columns converted from cents to dollars
+    return totals.assign(**{column: totals[column] / 100 for column in columns})
+
+
+class MonthlyTotalsAccumulator:
+    def __init__(self):
+        self.totals = empty_totals()  # Running totals; only ever months x categories in size
+
+    def add(self, df, date_column):
+        # Fold another batch of categorized transactions into the running totals
+        self.totals = self.totals.add(monthly_category_totals(df, date_column), fill_value=0)
+
+    def subtract(self, df, date_column):
+        # Take a batch that was added before back out of the running totals
+        self.totals = self.totals.sub(monthly_category_totals(df, date_column), fill_value=0)
+
+    def result(self):
+        totals = self.totals[self.totals['count'] != 0].sort_index()  # Months and categories whose rows were all taken back out are gone
+        return totals.astype('int64')  # add() with fill_value works in floats; whole cents are exact there
+
+
+class MonthlyReport:
+    def __init__(self, totals):
+        # Everything is derived from the (YearMonth, Category) totals table in whole-table operations.
+        # The totals stay in exact cents; months and categories are in dollars for display.
+        self.totals = totals
+
+        # One row per month: spend, income and profit, added up in cents
+        months = totals.groupby(level='YearMonth')[['spent', 'income', 'count']].sum()
+        months['profit'] = months['income'] + months['spent']
+        months = totals_in_dollars(months, ['spent', 'income', 'profit'])
+        months['profit_percentage'] = (months['profit'] / months['income'] * 100).where(months['income'] != 0, 0.0)
+        self.months = months
+
+        # One row per month and category, with percentages of that month's spending
+        month_spent = months['spent'].reindex(totals.index, level='YearMonth')
+        categories = totals_in_dollars(totals)
+        categories['spent_percentage'] = categories['spent'] / month_spent * 100
+        categories['net_percentage'] = categories['net'] / month_spent.abs() * 100
+        self.categories = categories
+
+    def category_rows(self, column='spent'):
+        # Map each month to its (category, total, percentage) rows, largest percentage first.
+        # 'spent' only lists categories with spending; 'net' lists every category with transactions.
+        categories = self.categories
+        if column == 'spent':
+            categories = categories[categories['spent_count'] > 0]
+        percentages = f'{column}_percentage'
+        # One stable sort for all months; ties keep the alphabetical category order
+        order = categories.reset_index().sort_values(by=['YearMonth', percentages], ascending=[True, False], kind='stable')
+        rows = {}
+        for name, category, total, percentage in zip(order['YearMonth'], order['Category'], order[column], order[percentages]):
+            rows.setdefault(name, []).append((category, total, percentage))
+        return rows
+
+    def to_dict(self, column='spent'):
+        # Plain Python structure of the report for the GUI, the exporters and other callers; column picks the
+        # category rows the same way as category_rows
+        rows = self.category_rows(column)
+        return {
+            str(name): {
+                'spent': month.spent,
+                'income': month.income,
+                'profit': month.profit,
+                'profit_percentage': month.profit_percentage,
+                'categories': {category: {'total': total, 'percentage': percentage} for category, total, percentage in rows.get(name, [])},
+            }
+            for name, month in zip(self.months.index, self.months.itertuples())
+        }
@@ -0,0 +1,315 @@
+"""Pipeline shared by every account tracker: load, clean, categorize, date and sort the transactions."""
+
+import pandas as pd
+from pathlib import Path
+from trackers.categorizer import CategoryMatcher, rules_hash
+from trackers.merchant_cache import CategoryCache
+from trackers.date_index import DateRangeIndex
+from trackers.export import EXPORT_FORMATS, export_report
+from trackers.recurring import ROLLING_WINDOWS, detect_recurring, rolling_category_spend
+from trackers.rule_index import RuleIndex
+from trackers.rules import load_rules, rules_file, rules_mtime
+from trackers.search import TransactionIndex
+from trackers.sniff import BANK_FORMAT, sniff_layout
+from trackers.ingest import read_bank_csv, read_bank_csv_chunks, parse_amounts, parse_dates
+from trackers.aggregation import MonthlyTotalsAccumulator, MonthlyReport, monthly_category_totals
+from trackers.transaction_store import TransactionStore, STORE_FILE_NAME
+from trackers.instrumentation import PipelineProfiler
+from trackers.schema import CENTS_COLUMN, compact_frame, month_column, to_dollars
+
+
+class TrackerCancelled(Exception):
+    """Raised by process_data when a run is cancelled between stages."""
+
+
+class BaseTracker:
+    date_column = 'Date'  # Name given to the date column of this account's export
+    account = 'account'  # Short account name, used for cache file names and to find rules/<account>.json
+    report_column = 'spent'  # Which totals the report breaks down by category ('spent' or 'net')
+
+    def __init__(self, file_path, categories=None, use_store=False, profile=False, rules_path=None, file_format=None):
+        self.file_path = file_path  # Path to the CSV file containing the transaction data
+        self.file_format = file_format  # FileFormat of the CSV (delimiter, columns, date format), sniffed on first read if not given
+        self.df = None  # DataFrame to store the transaction data
+        self.report = None  # MonthlyReport of the processed data
+        # Category rules: given directly, or read from rules_path (by default rules/<account>.json)
+        self.rules_path = None
+        self.rules_mtime = None  # Modification time of the rule file when it was last read
+        if categories is None:
+            self.rules_path = Path(rules_path) if rules_path is not None else rules_file(self.account)
+            self.rules_mtime = rules_mtime(self.rules_path)
+            categories = load_rules(self.rules_path)
+        self.categories = categories  # Dictionary to categorize transactions based on keywords in the description
+        self.matcher = CategoryMatcher(self.categories)  # Patterns are compiled the first time a description needs scoring
+        # Merchant -> category cache kept next to the CSV files and reset whenever the categories change
+        self.cache = CategoryCache(Path(file_path).parent / '.tracker_cache' / f'{self.account}_categories.json', self.matcher.rules_hash)
+        self.rule_index = None  # Pattern -> matched descriptions of self.df, built on the first update_categories and reset whenever the rows change
+        self.search_index = None  # TransactionIndex over self.df, built on the first search after each report
+        self.range_index = None  # DateRangeIndex over self.df, built on the first date-range query after each report
+        # With use_store the CSV is merged into a local transaction store and reports come from the store's monthly
+        # totals; self.df then holds only the rows this run added until load_history() swaps in the whole history
+        self.use_store = use_store
+        self.history_loaded = False
+        self.store = TransactionStore(Path(file_path).parent / STORE_FILE_NAME)
+        # With profile every stage records its time, rows in and out and peak memory (see profiler.to_json)
+        self.profiler = PipelineProfiler() if profile else None
+
+    def layout(self):
+        # The CSV's FileFormat, sniffed from its first few KB the first time it is needed
+        if self.file_format is None:
+            try:
+                self.file_format = sniff_layout(self.file_path)[0]
+            except (OSError, ValueError):
+                self.file_format = BANK_FORMAT  # Let the read itself report what is wrong with the file
+        return self.file_format
+
+    def load_csv(self):
+        # Try to load the CSV file into a DataFrame
+        try:
+            self.df = read_bank_csv(self.file_path, self.date_column, self.layout())  # Only the needed columns, already typed
+            self.rule_index = None  # It indexed the previous rows, which may have been the file before an edit
+            print("CSV file loaded successfully.")
+        except Exception as e:
+            # If there's an error, print it
+            print(f"Error loading CSV file: {e}")
+
+    def clean_data(self):
+        # Frames from read_bank_csv are already compact (cents, compact descriptions); only frames from elsewhere need converting
+        if CENTS_COLUMN in self.df:
+            return
+        self.df = self.df[[self.date_column, 'Amount', 'Description']].copy()  # Keep only relevant columns, as a frame of our own
+        # Text amounts still need cleaning before they can become cents
+        if not pd.api.types.is_numeric_dtype(self.df['Amount']):
+            self.df['Amount'] = parse_amounts(self.df['Amount'], self.layout().decimal)
+        compact_frame(self.df)
+
+    def categorize_transaction(self, description):
+        # Categorize a single description with the shared matcher
+        return self.matcher.categorize_one(description)
+
+    def apply_categorization(self):
+        # Apply categorization to each transaction based on the description
+        self.df['Category'] = self.cache.categorize(self.matcher, self.df['Description'])  # Only merchants not seen before are scored
+        self.cache.save()  # Keep the merchant categories for the next run
+
+    def update_categories(self, categories):
+        # Switch to new category rules. Only the transactions matched by added, removed or edited
+        # keywords are re-scored; the first call also indexes which keywords match which descriptions.
+        # Returns how many transactions changed category.
+        matcher = CategoryMatcher(categories)
+        changed = 0
+        if self.df is not None and 'Category' in self.df:
+            if self.rule_index is None:
+                self.rule_index = RuleIndex(self.matcher, self.df['Description'])
+            changed = self.rule_index.update(matcher)
+            # Lined up by row label, so the current sort order does not matter. A new frame rather than an in-place write:
+            # the GUI may still be drawing the old one on another thread until it is handed this one.
+            self.df = self.df.assign(Category=self.rule_index.categories())
+        self.categories = categories
+        self.matcher = matcher
+        self.cache = CategoryCache(self.cache.path, matcher.rules_hash)  # The old cache belongs to the old rules
+        if self.use_store:
+            self.sync_store_rules()  # Re-categorizes the stored history and rebuilds its totals
+            self.history_loaded = False  # Read again, with the new categories, when rows are next needed
+        if self.report is not None:
+            self.sort_data()
+            self.build_report()
+        return changed
+
+    def rules_changed(self):
+        # Whether the rule file was edited since it was last read
+        return self.rules_path is not None and rules_mtime(self.rules_path) != self.rules_mtime
+
+    def reload_rules(self):
+        # Re-read the rule file and re-categorize the loaded transactions in place; returns how many changed
+        # category (None when the file did not change). The transactions are not read again.
+        if not self.rules_changed():
+            return None
+        self.rules_mtime = rules_mtime(self.rules_path)  # Recorded first, so a broken edit is reported once, not on every poll
+        categories = load_rules(self.rules_path)
+        if rules_hash(categories) == self.matcher.rules_hash:
+            return 0  # Saved without a real change
+        return self.update_categories(categories)
+
+    def process_dates(self):
+        # Convert the date column to datetime format if loading did not already do it
+        if not pd.api.types.is_datetime64_any_dtype(self.df[self.date_column]):
+            self.df[self.date_column] = parse_dates(self.df[self.date_column])  # Invalid dates become NaT
+        # Drop any rows with invalid dates, without copying the frame when there are none
+        invalid = self.df[self.date_column].isna()
+        if invalid.any():
+            self.df = self.df[~invalid].copy()
+            self.rule_index = None  # Fewer rows than it indexed, so its change counts would be off
+
+    def sync_store_rules(self):
+        # Stored categories, and the monthly totals built from them, are only valid for the rules they were computed with
+        if self.store.rules_hash(self.account) != self.matcher.rules_hash:
+            stored = self.store.descriptions(self.account)
+            if len(stored):
+                self.store.update_categories(stored['txn_id'], self.cache.categorize(self.matcher, stored['description']))
+                self.store.rebuild_totals(self.account)
+            self.store.set_rules_hash(self.account, self.matcher.rules_hash)
+
+    def import_to_store(self):
+        # Add the CSV rows the store has not seen yet, categorizing only those and folding them into the stored
+        # monthly totals. The history is not read back: self.df keeps just the new rows.
+        self.load_csv()
+        self.clean_data()
+        self.process_dates()  # Dates are part of the transaction id, so they are parsed before categorizing
+        all_rows = self.df
+        self.sync_store_rules()
+
+        self.df = self.store.new_rows(self.account, all_rows, self.date_column)
+        print(f"{len(self.df)} new of {len(all_rows)} transactions in {Path(self.file_path).name}.")
+        if len(self.df):
+            self.apply_categorization()
+            self.store.append(self.account, self.df, self.date_column)
+        else:
+            self.df = self.df.assign(Category=pd.Categorical([], dtype=self.matcher.category_dtype))
+        self.df = self.df.drop(columns='txn_id')
+        self.history_loaded = False
+
+    def load_history(self):
+        # The transactions to show, search or export. With use_store that is the account's whole stored history,
+        # read on first need instead of on every run; the report itself only needs the stored totals.
+        if self.use_store and not self.history_loaded:
+            self.df = compact_frame(self.store.load(self.account, self.date_column).drop(columns='txn_id'))
+            self.df['Category'] = self.df['Category'].astype(self.matcher.category_dtype)
+            self.sort_data()
+            self.df['YearMonth'] = month_column(self.df[self.date_column])
+            self.history_loaded = True
+            self.rule_index = self.search_index = self.range_index = None  # They indexed the previous rows
+        return self.df
+
+    def sort_data(self):
+        # Sort the DataFrame by date and category
+        self.df = self.df.sort_values(by=[self.date_column, 'Category'])  # Sort by date and then by category
+
+    def build_report(self):
+        # Compute the month of every transaction once, then every monthly total in one pass.
+        # With use_store the totals are already kept per month in the store, so the history is not summed again.
+        self.df['YearMonth'] = month_column(self.df[self.date_column])
+        if self.use_store:
+            self.report = MonthlyReport(self.store.load_totals(self.account))
+        else:
+            self.report = MonthlyReport(monthly_category_totals(self.df, self.date_column))
+        self.search_index = None  # The transactions changed, so any search or date-range index is stale
+        self.range_index = None
+        return self.report
+
+    def report_summary(self):
+        # The processed report as plain Python data, for the GUI and the exporters
+        return {'account': self.account, 'file': Path(self.file_path).name, 'column': self.report_column,
+                'months': self.report.to_dict(self.report_column)}
+
+    def export(self, directory, formats=EXPORT_FORMATS):
+        # Write the report and every transaction as JSON, CSV and/or HTML into directory
+        return self.run_stage("Exporting", lambda: export_report(self, directory, formats))
+
+    def transaction_index(self):
+        # Search index over the processed transactions, built once per report
+        self.load_history()
+        if self.search_index is None:
+            self.search_index = TransactionIndex(self.df, self.date_column)
+        return self.search_index
+
+    def date_range_index(self):
+        # Totals for any date range and category in two binary searches, built once per report
+        self.load_history()
+        if self.range_index is None:
+            self.range_index = DateRangeIndex(self.df, self.date_column)
+        return self.range_index
+
+    def search(self, query='', **filters):
+        # Processed transactions matching a search string such as "wdw >100 from:2024-01-01", plus any
+        # TransactionIndex.search keyword filters (terms, start, end, month, min_amount, max_amount, category)
+        return self.df.iloc[self.transaction_index().query(query, **filters)]
+
+    def recurring_charges(self, min_occurrences=3):
+        # Subscriptions and other charges repeating at a regular period, found from the processed transactions
+        return detect_recurring(self.load_history(), self.date_column, min_occurrences)
+
+    def rolling_spend(self, windows=ROLLING_WINDOWS):
+        # Trailing 7/30/90-day spending per category for every day, in cents
+        return rolling_category_spend(self.load_history(), self.date_column, windows)
+
+    def transactions_view(self, df):
+        # Transactions the way they are printed: date, dollar amount, description and category
+        return pd.DataFrame({
+            self.date_column: df[self.date_column],
+            'Amount': to_dollars(df[CENTS_COLUMN]),
+            'Description': df['Description'],
+            'Category': df['Category'],
+        })
+
+    def display_monthly_totals(self, grouped):
+        # Calculate and return the total spent for each month
+        monthly_totals = []
+        for name, group in grouped:
+            expenses = group[group[CENTS_COLUMN] < 0]  # Consider only expenses (negative amounts)
+            total_spent = expenses[CENTS_COLUMN].sum() / 100  # Sum the amounts
+            monthly_totals.append(f"Total spent in {name}: ${total_spent:.2f}")  # Append the formatted total
+        return monthly_totals
+
+    def display_data(self):
+        # Each account prints its own report
+        raise NotImplementedError
+
+    def pipeline_stages(self):
+        # (label, method) for each processing step, in the order they run
+        if self.use_store:
+            stages = [("Importing into store", self.import_to_store)]  # Merge the CSV into the store and work on the stored history
+        else:
+            stages = [
+                ("Loading CSV", self.load_csv),  # Load the data from the CSV file
+                ("Cleaning data", self.clean_data),  # Clean the data to ensure it's in the right format
+                ("Categorizing", self.apply_categorization),  # Categorize each transaction
+                ("Processing dates", self.process_dates),  # Convert and validate the date format
+            ]
+        stages.append(("Sorting", self.sort_data))  # Sort the data by date and category
+        stages.append(("Building report", self.build_report))  # Group by month and total everything once
+        return stages
+
+    def process_data(self, progress=None, cancel_event=None):
+        # Run the processing steps in sequence, leaving the sorted transactions in self.df.
+        # progress(stage_number, stage_count, label) is called before each stage, and a set
+        # cancel_event (threading.Event) stops the run before the next stage starts.
+        stages = self.pipeline_stages()
+        if self.profiler is not None:
+            self.matcher.reset_stats()
+        for number, (label, stage) in enumerate(stages, start=1):
+            if cancel_event is not None and cancel_event.is_set():
+                raise TrackerCancelled(f"Cancelled before: {label}")
+            if progress is not None:
+                progress(number, len(stages), label)
+            self.run_stage(label, stage)
+        if self.profiler is not None:
+            self.profiler.record_categories(self.df['Category'].value_counts(), self.matcher)
+
+    def row_count(self):
+        return 0 if self.df is None else len(self.df)
+
+    def run_stage(self, label, stage):
+        # Run one stage, under the profiler when profiling is on
+        if self.profiler is None:
+            return stage()
+        with self.profiler.stage(label, self.row_count):
+            return stage()
+
+    def run(self):
+        # Process the data, then display it and the monthly totals
+        self.process_data()
+        self.load_history()
+        self.run_stage("Displaying", self.display_data)
+
+    def run_streaming(self, chunksize=100_000):
+        # Read the CSV chunk by chunk, keeping only running monthly totals in memory, then display the totals
+        accumulator = MonthlyTotalsAccumulator()
+        for chunk in read_bank_csv_chunks(self.file_path, self.date_column, chunksize, self.layout()):
+            chunk['Category'] = self.cache.categorize(self.matcher, chunk['Description'])
+            chunk = chunk[chunk[self.date_column].notna()]  # Drop any rows with invalid dates
+            accumulator.add(chunk, self.date_column)
+        self.cache.save()
+        self.report = MonthlyReport(accumulator.result())
+        self.display_monthly_category_totals(self.report)
+        return self.report
@@ -0,0 +1,109 @@
+"""Headless batch mode: process many statement files in parallel and write one consolidated report."""
+
+import contextlib
+import glob
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import pandas as pd
+from trackers.aggregation import totals_in_dollars
+from trackers.reconciliation import DEFAULT_TOLERANCE_DAYS, Reconciliation
+from trackers.registry import tracker_for_file
+from trackers.schema import CENTS_COLUMN
+
+
+def expand_inputs(inputs):
+    # Turn directories, globs and file paths into a sorted list of CSV files
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.update(str(path) for path in Path(item).glob('*.csv'))
+        else:
+            paths.update(glob.glob(item) or [item])
+    return sorted(paths)
+
+
+def process_file(path, profile=False, export_dir=None):
+    # Worker: run the matching tracker on one file (exporting its report into export_dir when given) and return
+    # (path, account, totals, rows, seconds, error, profile, transactions for reconciliation)
+    start = time.perf_counter()
+    try:
+        tracker_class, file_format = tracker_for_file(path)  # Only the first few KB are read to pick the tracker
+    except OSError as e:
+        return path, None, None, 0, time.perf_counter() - start, f"could not read the file: {e}", None, None
+    if tracker_class is None:
+        return path, None, None, 0, time.perf_counter() - start, "could not tell the account from the file name or its contents", None, None
+    try:
+        # Built inside the try: a missing or malformed rules/<account>.json is this file's error, not the whole batch's
+        tracker = tracker_class(path, profile=profile, file_format=file_format)
+        with contextlib.redirect_stdout(io.StringIO()):  # Trackers print progress; batch mode reports on its own
+            tracker.process_data()
+            if export_dir is not None:
+                tracker.export(export_dir)
+    except Exception as e:
+        return path, tracker_class.account, None, 0, time.perf_counter() - start, f"{type(e).__name__}: {e}", None, None
+    stages = tracker.profiler.to_dict() if profile else None
+    transactions = tracker.df[[tracker.date_column, CENTS_COLUMN, 'Description', 'Category']].rename(columns={tracker.date_column: 'Date'})
+    return path, tracker.account, tracker.report.totals, len(tracker.df), time.perf_counter() - start, None, stages, transactions
+
+
+def consolidate(results):
+    # Stack the per-file totals into one table indexed by (account, file, YearMonth, Category)
+    frames = {(account, Path(path).name): totals for path, account, totals, _, _, error, _, _ in results if error is None}
+    if not frames:
+        return None
+    return pd.concat(frames, names=['account', 'file'])
+
+
+def run_batch(inputs, output, workers=None, profile=None, transfer_days=DEFAULT_TOLERANCE_DAYS, export_dir=None):
+    # Process every matching file across CPU cores and write the consolidated totals to output (CSV);
+    # with profile (a JSON path) the per-stage profile of every file is written there too.
+    # Transfers between accounts (matched within transfer_days) are left out of the combined summary.
+    # With export_dir, every file's report is also exported there as JSON, CSV and HTML.
+    paths = expand_inputs(inputs)
+    if not paths:
+        print("No CSV files found.")
+        return None
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(process_file, paths, [profile is not None] * len(paths), [export_dir] * len(paths)))
+    elapsed = time.perf_counter() - start
+
+    for path, account, _, rows, seconds, error, _, _ in results:
+        status = error if error else f"{rows:,} rows in {seconds:.2f} s"
+        print(f"{Path(path).name} ({account or 'unknown'}): {status}")
+
+    if profile is not None:
+        profiles = {Path(path).name: stages for path, _, _, _, _, error, stages, _ in results if error is None}
+        Path(profile).write_text(json.dumps(profiles, indent=2), encoding='utf-8')
+        print(f"Stage profiles written to {profile}")
+
+    consolidated = consolidate(results)
+    if consolidated is None:
+        print("Nothing to report.")
+        return None
+    totals_in_dollars(consolidated).to_csv(output)  # Totals are kept in cents; the report file is in dollars
+
+    # Combined spending per month across all accounts. The same transfer shows up in both accounts it moves
+    # between, so both sides are paired up and left out.
+    reconciliation = Reconciliation([(account, transactions, 'Date') for _, account, _, _, _, error, _, transactions in results if error is None],
+                                    transfer_days)
+    report = reconciliation.combined_report()
+    transfers_path = Path(output).with_name(f"{Path(output).stem}_transfers.csv")
+    reconciliation.pairs().to_csv(transfers_path, index=False)
+    print(f"\n{reconciliation.summary()}")
+    print(f"Transfers written to {transfers_path}")
+    print("\nAll accounts:")
+    for name, month in zip(report.months.index, report.months.itertuples()):
+        print(f"    {name}: spent ${month.spent:.2f}, income ${month.income:.2f}")
+
+    total_rows = sum(result[3] for result in results)
+    print(f"\nProcessed {len(paths)} files ({total_rows:,} rows) in {elapsed:.2f} s with {workers or os.cpu_count()} workers.")
+    print(f"Consolidated report written to {output}")
+    if export_dir is not None:
+        print(f"Reports exported to {export_dir}")
+    return consolidated
@@ -0,0 +1,131 @@
+"""Shared categorization engine used by all trackers to label transactions from keywords in the description."""
+
+import hashlib
+import json
+import re
+from functools import cached_property
+import numpy as np
+import pandas as pd
+from trackers.schema import category_dtype
+
+OTHER_CATEGORY = 'other'  # Category used when no keyword matches a description
+# Keywords that can depend on the text normalize_merchants strips from merchant keys: ones with digits, '#', '*' or '/'
+# (or a \d), and ones spanning words, since stripping a store number can bring two words together ('shell 5784 oil')
+NOISE_SENSITIVE = re.compile(r'[\d#*/\s]|\\[ds]')
+
+
+def rules_hash(categories):
+    # Stable fingerprint of a categories dict; order matters because it decides ties
+    return hashlib.sha256(json.dumps(categories).encode('utf-8')).hexdigest()
+
+
+def factorize_descriptions(descriptions):
+    # (codes, distinct descriptions) for a Series of descriptions; missing ones (code -1) pick the trailing ''
+    if isinstance(descriptions.dtype, pd.CategoricalDtype):
+        codes, uniques = descriptions.cat.codes.to_numpy(), descriptions.cat.categories  # Already factorized
+    else:
+        codes, uniques = pd.factorize(descriptions)
+    return codes, [str(description) for description in uniques] + ['']
+
+
+class CategoryMatcher:
+    def __init__(self, categories):
+        self.categories = categories  # Dictionary of category -> list of regex keywords
+        self.category_names = list(categories)  # Category order decides ties, same as the dict order
+        self.rules_hash = rules_hash(categories)  # Used to invalidate anything derived from these rules
+        self.patterns = []  # Unique keyword patterns in first-seen order
+        self.pattern_index = {}  # Pattern -> its row in weights
+        weights = []
+
+        # A keyword listed twice (or in two categories) is only searched once but still scores every listing
+        for column, keywords in enumerate(categories.values()):
+            for keyword in keywords:
+                if keyword not in self.pattern_index:
+                    self.pattern_index[keyword] = len(self.patterns)
+                    self.patterns.append(keyword)
+                    weights.append(np.zeros(len(self.category_names), dtype=np.int32))
+                weights[self.pattern_index[keyword]][column] += 1
+
+        # weights[p, c] is how many times pattern p is listed under category c
+        self.weights = np.vstack(weights) if weights else np.zeros((0, len(self.category_names)), dtype=np.int32)
+        # Lookup table from category position to label, with 'other' as the last entry
+        self.labels = np.array(self.category_names + [OTHER_CATEGORY], dtype=object)
+        self.category_dtype = category_dtype(self.labels)  # dtype of the Category column
+        self.reset_stats()
+
+    @cached_property
+    def compiled(self):
+        # Every pattern compiled once, on first use: when the merchant cache already knows every
+        # description, a run with unchanged rules never compiles a regex at all
+        return [re.compile(pattern, re.IGNORECASE) for pattern in self.patterns]
+
+    @cached_property
+    def combined(self):
+        # One alternation over all patterns, used to skip descriptions that cannot score at all
+        return re.compile('|'.join(f'(?:{pattern})' for pattern in self.patterns), re.IGNORECASE) if self.patterns else None
+
+    @cached_property
+    def noise_sensitive(self):
+        # One alternation over the keywords that can tell apart descriptions sharing a merchant key
+        # (such as 'target 00020347 sarasota fl' or 'shell oil'), or None when there are none
+        patterns = [pattern for pattern in self.patterns if NOISE_SENSITIVE.search(pattern)]
+        return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE) if patterns else None
+
+    def reset_stats(self):
+        # Counters of the regex work done, read by the pipeline profiler
+        self.stats = {'descriptions': 0, 'pattern_hits': np.zeros(len(self.patterns), dtype=np.int64)}
+
+    def category_hits(self):
+        # Pattern hits since the last reset_stats, added up per category
+        hits = self.stats['pattern_hits'] @ self.weights
+        return dict(zip(self.category_names, hits.tolist()))
+
+    def match_matrix(self, descriptions):
+        # Return a (descriptions x patterns) boolean matrix of which patterns hit which description
+        hits = np.zeros((len(descriptions), len(self.compiled)), dtype=bool)
+        if self.combined is None or len(descriptions) == 0:
+            return hits
+
+        # Only descriptions that match at least one pattern need to be checked pattern by pattern
+        search_any = self.combined.search
+        candidates = np.fromiter((search_any(d) is not None for d in descriptions), dtype=bool, count=len(descriptions))
+        rows = np.flatnonzero(candidates)
+        candidate_descriptions = [descriptions[i] for i in rows]
+        for column, pattern in enumerate(self.compiled):
+            search = pattern.search
+            hits[rows, column] = [search(d) is not None for d in candidate_descriptions]
+        self.stats['descriptions'] += len(descriptions)
+        self.stats['pattern_hits'] += hits.sum(axis=0)
+        return hits
+
+    def pattern_weights(self, pattern):
+        # How many times a pattern is listed under each category (all zeros if it is not a keyword here)
+        if pattern not in self.pattern_index:
+            return np.zeros(len(self.category_names), dtype=np.int32)
+        return self.weights[self.pattern_index[pattern]]
+
+    def score(self, hits):
+        # Turn a pattern hit matrix into the index of the winning category for each row
+        return self.winners(hits.astype(np.int32) @ self.weights)  # Hit count per category
+
+    def winners(self, scores):
+        # Index of the winning category for each row of a (rows x categories) score matrix
+        best = scores.argmax(axis=1) if scores.shape[1] else np.zeros(len(scores), dtype=np.intp)  # argmax keeps the first category on ties
+        best[scores.max(axis=1, initial=0) == 0] = len(self.category_names)  # No hits at all -> 'other'
+        return best
+
+    def categorize_unique(self, descriptions):
+        # Categorize a list of distinct lowercase descriptions and return their labels
+        return self.labels[self.score(self.match_matrix(descriptions))]
+
+    def categorize(self, descriptions):
+        # Categorize a whole Series of descriptions in one batch
+        descriptions = descriptions.fillna('').astype(str)
+        codes, uniques = pd.factorize(descriptions)  # Bank exports repeat descriptions, so only score each one once
+        lowered = [description.lower() for description in uniques]  # Match on lowercase text like the per-row version did
+        labels = self.categorize_unique(lowered)
+        return pd.Series(labels[codes], index=descriptions.index, name='Category')
+
+    def categorize_one(self, description):
+        # Categorize a single description string
+        return self.categorize_unique([str(description).lower()])[0]
@@ -0,0 +1,58 @@
+"""Totals for any date range: running sums per category over day-sorted transactions, answered with binary searches."""
+
+import numpy as np
+import pandas as pd
+from trackers.aggregation import TOTAL_COLUMNS
+from trackers.schema import CENTS_COLUMN
+
+DAY_OFFSET = 2 ** 31  # Keeps day numbers before 1970 positive inside the (category, day) search keys
+
+
+def day_bounds(start=None, end=None):
+    # Inclusive date range -> (first day, last day) as day numbers; None leaves that side open.
+    # Raises ValueError for a reversed range, whose running-sum difference would come out negative.
+    low = -DAY_OFFSET if start is None else pd.Timestamp(start).to_datetime64().astype('datetime64[D]').astype('int64')
+    high = DAY_OFFSET - 1 if end is None else pd.Timestamp(end).to_datetime64().astype('datetime64[D]').astype('int64')
+    if low > high:
+        raise ValueError(f"start {start} is after end {end}")
+    return low, high
+
+
+class DateRangeIndex:
+    def __init__(self, df, date_column):
+        # Fold the transactions into one row per (category, day), sorted by category then day, and keep running
+        # sums of every totals column over those rows. The totals of a category between two days are then two
+        # binary searches for the days and a subtraction of the running sums at those positions.
+        self.category_names = df['Category'].cat.categories
+        valid = df[date_column].notna().to_numpy()
+        codes = df['Category'].cat.codes.to_numpy()[valid].astype('int64')
+        days = df[date_column].to_numpy(dtype='datetime64[D]')[valid].astype('int64')
+        cents = df[CENTS_COLUMN].fillna(0).to_numpy(dtype='int64')[valid]
+        values = np.column_stack([cents.clip(max=0), cents.clip(min=0), cents, (cents < 0).astype('int64'), np.ones_like(cents)])
+
+        keys = codes * 2 ** 32 + (days + DAY_OFFSET)  # (category, day) as one sortable number
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        firsts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=np.intp)
+        self.keys = keys[firsts]  # One per (category, day) with transactions, ascending
+        daily = np.add.reduceat(values[order], firsts, axis=0) if len(firsts) else np.zeros((0, len(TOTAL_COLUMNS)), dtype='int64')
+        self.running = np.vstack([np.zeros((1, len(TOTAL_COLUMNS)), dtype='int64'), np.cumsum(daily, axis=0)])
+        # Unfiltered data never changes the index, so the first and last day bound every query
+        self.first_day = pd.Timestamp(days.min(), unit='D') if len(days) else None
+        self.last_day = pd.Timestamp(days.max(), unit='D') if len(days) else None
+
+    def category_totals(self, start=None, end=None):
+        # spent, income, net, spent_count and count per category (in cents) from start to end, both inclusive.
+        # Every category is looked up at once: 2 binary searches each, whatever the size of the range.
+        low, high = day_bounds(start, end)
+        codes = np.arange(len(self.category_names), dtype='int64') * 2 ** 32
+        begin = np.searchsorted(self.keys, codes + (low + DAY_OFFSET), 'left')
+        stop = np.searchsorted(self.keys, codes + (high + DAY_OFFSET), 'right')
+        totals = self.running[stop] - self.running[begin]
+        return pd.DataFrame(totals, index=pd.Index(self.category_names, name='Category'), columns=TOTAL_COLUMNS)
+
+    def totals(self, start=None, end=None, category=None):
+        # Totals of one category, or of every category together, from start to end (in cents)
+        totals = self.category_totals(start, end)
+        row = totals.sum() if category is None else totals.loc[category]
+        return {column: int(row[column]) for column in TOTAL_COLUMNS}
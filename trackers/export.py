@@ -0,0 +1,179 @@
+"""Report export: the monthly summary and every transaction written to JSON, CSV and HTML in one pass over the data."""
+
+import contextlib
+import csv
+import html
+import json
+import math
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from trackers.schema import TEXT_DTYPE
+
+EXPORT_FORMATS = ('json', 'csv', 'html')
+EXPORT_CHUNKSIZE = 50_000  # Transactions formatted at a time; only one chunk is ever held as text
+
+
+def plain_numbers(value):
+    # Summary values ready for JSON: NaN and infinite percentages (months without spending) become null, as
+    # json.dumps would write them as NaN or Infinity, which no JSON parser accepts (pandas writes null too)
+    if isinstance(value, dict):
+        return {key: plain_numbers(item) for key, item in value.items()}
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def escape_text(texts):
+    # HTML-escape a Series of Arrow strings without a Python call per row
+    return texts.str.replace('&', '&amp;').str.replace('<', '&lt;').str.replace('>', '&gt;')
+
+
+def amount_text(amounts):
+    # Dollar amounts as text with exactly two decimals ('' when missing), built from whole cents in bulk
+    cents = np.round(amounts.to_numpy(dtype='float64') * 100)
+    missing = np.isnan(cents)
+    cents = np.where(missing, 0, cents).astype('int64')
+    whole = pd.Series(np.abs(cents) // 100, index=amounts.index).astype(TEXT_DTYPE)
+    fraction = pd.Series(np.abs(cents) % 100, index=amounts.index).astype(TEXT_DTYPE).str.pad(2, fillchar='0')
+    text = pd.Series(np.where(cents < 0, '-', ''), index=amounts.index).astype(TEXT_DTYPE) + whole + '.' + fraction
+    return text.where(~missing, '')
+
+
+class ExportWriter:
+    # One output file. It is written under a temporary name and only moved into place once complete,
+    # so a failed export never leaves a truncated report behind.
+    suffix = None
+
+    def __init__(self, path, summary):
+        self.path = Path(path)
+        self.temp_path = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+        self.summary = summary  # report_summary() of the tracker being exported
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.temp_path, 'w', encoding='utf-8', newline='')
+        self.write_header()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            if exc_type is None:
+                self.write_footer()
+        finally:
+            self.file.close()
+        if exc_type is None:
+            os.replace(self.temp_path, self.path)
+        else:
+            self.temp_path.unlink(missing_ok=True)
+
+    def write_header(self):
+        pass
+
+    def write_rows(self, rows):
+        # rows: transactions_view() of one chunk, with dates already formatted as text
+        raise NotImplementedError
+
+    def write_footer(self):
+        pass
+
+
+class CsvWriter(ExportWriter):
+    # Transactions in <stem>.csv; the small monthly category totals go next to it in <stem>_monthly.csv
+    suffix = 'csv'
+
+    def write_header(self):
+        self.header = True
+
+    def write_rows(self, rows):
+        rows.to_csv(self.file, header=self.header, index=False)  # Amounts are already rounded to cents
+        self.header = False
+
+    def write_footer(self):
+        with open(self.path.with_name(f'{self.path.stem}_monthly.csv'), 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['month', 'category', 'total', 'percentage'])
+            for month, values in self.summary['months'].items():
+                writer.writerows([month, category, f"{row['total']:.2f}", f"{row['percentage']:.2f}"]
+                                 for category, row in values['categories'].items())
+
+
+class JsonWriter(ExportWriter):
+    # {"account": ..., "months": {...}, "transactions": [...]}, with the transactions appended chunk by chunk
+    suffix = 'json'
+
+    def write_header(self):
+        header = json.dumps(plain_numbers(self.summary), allow_nan=False)
+        self.file.write(header[:-1] + ', "transactions": [')  # Reopen the object to stream the list into it
+        self.first = True
+
+    def write_rows(self, rows):
+        records = rows.to_json(orient='records')[1:-1]  # pandas serializes the chunk in C; drop its brackets
+        if records:
+            self.file.write(records if self.first else ',' + records)
+            self.first = False
+
+    def write_footer(self):
+        self.file.write(']}\n')
+
+
+class HtmlWriter(ExportWriter):
+    # Static page: a table per month of category totals, then every transaction
+    suffix = 'html'
+
+    def write_header(self):
+        title = html.escape(f"{self.summary['account']} report: {self.summary['file']}")
+        parts = [f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{title}</title>',
+                 '<style>body{font-family:sans-serif} table{border-collapse:collapse;margin-bottom:1em}'
+                 ' td,th{padding:2px 8px;border-bottom:1px solid #ddd} td.n{text-align:right}</style></head><body>',
+                 f'<h1>{title}</h1>']
+        for month, values in self.summary['months'].items():
+            parts.append(f"<h2>{month}</h2><p>Spent ${abs(values['spent']):.2f}, income ${values['income']:.2f}, "
+                         f"profit ${values['profit']:.2f} ({values['profit_percentage']:.2f}%)</p>")
+            parts.append('<table><tr><th>Category</th><th>Total</th><th>Percentage</th></tr>')
+            for category, row in values['categories'].items():
+                parts.append(f"<tr><td>{html.escape(str(category))}</td><td class=n>${row['total']:.2f}</td>"
+                             f"<td class=n>{row['percentage']:.2f}%</td></tr>")
+            parts.append('</table>')
+        parts.append('<h2>Transactions</h2><table><tr><th>Date</th><th>Amount</th><th>Description</th><th>Category</th></tr>')
+        self.file.write('\n'.join(parts) + '\n')
+
+    def write_rows(self, rows):
+        date, amount, description, category = (rows[column] for column in rows.columns)
+        category = category.cat.rename_categories(lambda name: html.escape(str(name)))  # Escape each category name once
+        lines = ('<tr><td>' + date.astype(TEXT_DTYPE) + '</td><td class=n>' + amount_text(amount) + '</td><td>'
+                 + escape_text(description.astype(object).fillna('').astype(TEXT_DTYPE)) + '</td><td>'
+                 + category.astype(object).fillna('').astype(TEXT_DTYPE) + '</td></tr>')
+        self.file.write('\n'.join(lines.to_numpy(dtype=object)) + '\n')
+
+    def write_footer(self):
+        self.file.write('</table></body></html>\n')
+
+
+WRITERS = {writer.suffix: writer for writer in (JsonWriter, CsvWriter, HtmlWriter)}
+
+
+def export_report(tracker, directory, formats=EXPORT_FORMATS, chunksize=EXPORT_CHUNKSIZE):
+    # Write a processed tracker's report to <directory>/<file stem>_report.<format> for every format. The
+    # transactions are formatted once per chunk and handed to every writer, so all files fill in one pass.
+    # Returns the written paths.
+    unknown = set(formats) - set(WRITERS)
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(sorted(unknown))}")
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = f'{Path(tracker.file_path).stem}_report'
+    summary = tracker.report_summary()
+    transactions = tracker.load_history()  # With a transaction store the history is only read here
+    writers = [WRITERS[suffix](directory / f'{stem}.{suffix}', summary) for suffix in formats]
+    with contextlib.ExitStack() as stack:
+        for writer in writers:
+            stack.enter_context(writer)
+        for start in range(0, len(transactions), chunksize):
+            rows = tracker.transactions_view(transactions.iloc[start:start + chunksize])
+            rows[tracker.date_column] = rows[tracker.date_column].to_numpy(dtype='datetime64[D]').astype(str)  # 2024-01-31
+            rows['Amount'] = np.round(rows['Amount'], 2)
+            for writer in writers:
+                writer.write_rows(rows)
+    return [writer.path for writer in writers]
@@ -0,0 +1,79 @@
+"""Shared CSV ingestion for transaction exports: the bank's 5-column layout by default, or any layout found by trackers.sniff."""
+
+import importlib.util
+import numpy as np
+import pandas as pd
+from trackers.schema import DESCRIPTION_DTYPE, compact_frame
+from trackers.sniff import BANK_FORMAT
+
+# Layout of the bank export: "MM/DD/YYYY","-8.45","*","","DESCRIPTION" (BANK_FORMAT reads columns 0, 1 and 4)
+BANK_COLUMNS = ['Date', 'Amount', 'Symbol', 'Symbol2', 'Description']
+DATE_FORMAT = '%m/%d/%Y'
+
+
+def csv_engine():
+    # Use the multithreaded pyarrow CSV reader when it is installed, otherwise pandas' C parser
+    return 'pyarrow' if importlib.util.find_spec('pyarrow') is not None else 'c'
+
+
+def parse_amounts(amounts, decimal='.'):
+    # Slow path for amounts with symbols in them, such as "$1,234.56", or with a decimal comma, such as "-1.234,56"
+    amounts = amounts.astype(str)
+    if decimal != '.':
+        amounts = amounts.str.replace('.', '', regex=False).str.replace(decimal, '.', regex=False)  # 1.234,56 -> 1234.56
+    amounts = amounts.str.replace(r'[^\d.-]', '', regex=True)  # Remove unwanted characters
+    return pd.to_numeric(amounts.replace('', pd.NA), errors='coerce')  # Invalid values become NaN
+
+
+def parse_dates(dates, date_format=DATE_FORMAT):
+    # Parse dates with a fixed format (MM/DD/YYYY unless sniffed otherwise) instead of inferring it element by element.
+    # A statement only has a few distinct dates, so each one is parsed once and then broadcast back.
+    codes, uniques = pd.factorize(dates)  # Missing dates get code -1
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format=date_format, errors='coerce').to_numpy()
+    parsed = np.append(parsed, np.datetime64('NaT', 'ns'))  # Code -1 picks this trailing NaT
+    return pd.Series(parsed[codes], index=dates.index, name=dates.name)
+
+
+def read_options(date_column, file_format=BANK_FORMAT):
+    # read_csv arguments for a layout, naming the date column the way the tracker expects
+    usecols, names = file_format.columns(date_column)
+    return {
+        'header': None,
+        'skiprows': 1 if file_format.header else 0,  # Column names are the file's own; ours are given instead
+        'sep': file_format.delimiter,
+        'names': names,
+        'usecols': usecols,
+        # Arrow strings are read straight into their compact form; a categorical is faster to build after reading.
+        # Decimal-comma amounts are read as text, since a float parser would take the 1.234 of 1.234,56 for a fraction.
+        'dtype': {date_column: str, 'Amount': 'float64' if file_format.decimal == '.' else str, 'Description': str if DESCRIPTION_DTYPE == 'category' else DESCRIPTION_DTYPE},
+        'quotechar': '"',
+    }
+
+
+def read_bank_csv(file_path, date_column='Date', file_format=BANK_FORMAT):
+    # Read an export with only the needed columns, amounts in cents and parsed dates
+    options = read_options(date_column, file_format)
+    try:
+        df = pd.read_csv(file_path, engine=csv_engine(), **options)
+    except ValueError:
+        # Amount has non-numeric characters in it; read it as text and clean it up
+        options['dtype']['Amount'] = str
+        df = pd.read_csv(file_path, engine=csv_engine(), **options)
+    if options['dtype']['Amount'] is str:
+        df['Amount'] = parse_amounts(df['Amount'], file_format.decimal)
+    df[date_column] = parse_dates(df[date_column], file_format.date_format)
+    return compact_frame(df)
+
+
+def read_bank_csv_chunks(file_path, date_column='Date', chunksize=100_000, file_format=BANK_FORMAT):
+    # Yield the export as typed DataFrames of at most chunksize rows, for files too big to hold in memory
+    options = read_options(date_column, file_format)
+    options['dtype']['Amount'] = str  # A bad amount in a later chunk should not stop the whole read
+    for chunk in pd.read_csv(file_path, engine='c', chunksize=chunksize, **options):  # pyarrow cannot read in chunks
+        try:
+            # to_numeric only knows decimal points; decimal-comma amounts always take the slow path
+            chunk['Amount'] = pd.to_numeric(chunk['Amount']) if file_format.decimal == '.' else parse_amounts(chunk['Amount'], file_format.decimal)
+        except ValueError:
+            chunk['Amount'] = parse_amounts(chunk['Amount'])
+        chunk[date_column] = parse_dates(chunk[date_column], file_format.date_format)
+        yield compact_frame(chunk)
@@ -0,0 +1,73 @@
+"""Per-stage instrumentation for the tracker pipeline: wall time, rows in and out, peak memory and regex hits."""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class PipelineProfiler:
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory  # tracemalloc makes allocations slower, so it can be turned off
+        self.stages = []  # One dict per stage, in the order they ran
+        self.categories = {}  # Filled in by record_categories
+
+    @contextmanager
+    def stage(self, label, row_count):
+        # Measure one stage; row_count() is called before and after it to get rows in and out
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        rows_in = row_count()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            entry = {'stage': label, 'seconds': round(seconds, 6), 'rows_in': rows_in, 'rows_out': row_count()}
+            if self.trace_memory:
+                entry['peak_mb'] = round((tracemalloc.get_traced_memory()[1] - memory_before) / 1e6, 3)  # Above the stage's starting usage
+                if started_tracing:
+                    tracemalloc.stop()
+            self.stages.append(entry)
+
+    def record_categories(self, category_counts, matcher):
+        # Rows per final category, plus how much regex work the matcher actually did
+        pattern_hits = matcher.category_hits()
+        self.categories = {
+            'rows': {category: int(count) for category, count in category_counts.items()},
+            'regex_hits': {category: int(hits) for category, hits in pattern_hits.items()},
+            'regex_descriptions': int(matcher.stats['descriptions']),  # Descriptions scanned; the rest came from the cache
+        }
+
+    def to_dict(self):
+        return {'stages': self.stages, 'total_seconds': round(sum(stage['seconds'] for stage in self.stages), 6), 'categories': self.categories}
+
+    def to_json(self, path=None):
+        # JSON text of the profile, also written to path when one is given
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return text
+
+    def summary(self):
+        # Human-readable lines, with the slowest stage marked
+        if not self.stages:
+            return "No stages recorded."
+        total = sum(stage['seconds'] for stage in self.stages)
+        slowest = max(self.stages, key=lambda stage: stage['seconds'])
+        lines = [f"Pipeline profile ({total:.3f} s):"]
+        for stage in self.stages:
+            share = stage['seconds'] / total * 100 if total else 0
+            memory = f", {stage['peak_mb']:.1f} MB peak" if 'peak_mb' in stage else ""
+            marker = "  <- slowest" if stage is slowest else ""
+            lines.append(f"    - {stage['stage']}: {stage['seconds']:.3f} s ({share:.1f}%), rows {stage['rows_in']:,} -> {stage['rows_out']:,}{memory}{marker}")
+        if self.categories:
+            lines.append(f"    Regex scanned {self.categories['regex_descriptions']:,} descriptions; hits by category: "
+                         + ", ".join(f"{category} {hits:,}" for category, hits in self.categories['regex_hits'].items()))
+        return "\n".join(lines)
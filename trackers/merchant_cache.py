@@ -0,0 +1,111 @@
+"""Normalizes noisy bank descriptions to merchant keys and remembers their categories between runs."""
+
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+import pandas as pd
+from trackers.categorizer import factorize_descriptions
+from trackers.schema import TEXT_DTYPE
+
+# Noise that changes between statements for the same merchant: dates, reference numbers and store numbers
+DATE_PATTERN = r'\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b'  # 12/09 or 12/09/2023
+NUMBER_PATTERN = r'\d{3,}'  # 231209, 000709331772034, #828, F4142
+SYMBOL_PATTERN = r'[#*]'  # Leftover store-number markers such as '#' and 'SQ *'
+CACHE_VERSION = 3  # Bumped when the meaning of the saved entries changes, so older cache files are discarded
+
+
+def normalize_merchants(descriptions):
+    # Turn a Series of raw descriptions into canonical lowercase merchant keys
+    keys = descriptions.astype(object).fillna('').astype(TEXT_DTYPE).str.lower()  # Arrow strings when available: much faster regexes
+    keys = keys.str.replace(DATE_PATTERN, ' ', regex=True)
+    keys = keys.str.replace(NUMBER_PATTERN, ' ', regex=True)
+    keys = keys.str.replace(SYMBOL_PATTERN, ' ', regex=True)
+    return keys.str.replace(r'\s+', ' ', regex=True).str.strip()  # Collapse the gaps left behind
+
+
+class CategoryCache:
+    def __init__(self, path, rules_hash, max_entries=50000):
+        self.path = Path(path)  # JSON file the cache is saved to
+        self.rules_hash = rules_hash  # Hash of the categories the cached answers came from
+        self.max_entries = max_entries  # Oldest entries are evicted past this size
+        self.entries = None  # OrderedDict of key -> category, loaded on first use
+        self.dirty = False  # Whether there is anything new to save
+
+    def load(self):
+        # Read the cache from disk, discarding it if it was built from different rules
+        self.entries = OrderedDict()
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return  # No cache yet, or an unreadable one; start empty
+        if data.get('rules_hash') == self.rules_hash and data.get('version') == CACHE_VERSION:
+            self.entries.update(data.get('entries', {}))
+        else:
+            self.dirty = True  # Rules changed, so overwrite the stale file on the next save
+
+    def lookup(self, key):
+        # Return the cached category for a key (or None) and mark it as recently used
+        category = self.entries.get(key)
+        if category is not None:
+            self.entries.move_to_end(key)
+        return category
+
+    def store(self, key, category):
+        # Remember a category, evicting the least recently used entries past max_entries
+        self.entries[key] = category
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.dirty = True
+
+    def categorize(self, matcher, descriptions):
+        # Categorize a Series of descriptions, only running the matcher for merchants not seen before
+        if self.entries is None:
+            self.load()
+
+        codes, uniques = factorize_descriptions(descriptions)
+        raw = [description.lower() for description in uniques]
+        keys = normalize_merchants(pd.Series(uniques)).tolist()
+
+        # Descriptions a noise-sensitive keyword matches are told apart by exactly the text the merchant key drops,
+        # so they never use or fill the shared merchant entry (TARGET 00020347 must not get TARGET 00099999's answer)
+        sensitive = matcher.noise_sensitive
+        pinned = [False] * len(uniques) if sensitive is None else [sensitive.search(description) is not None for description in raw]
+
+        labels = [None] * len(uniques)
+        missing = []
+        for i in range(len(uniques)):
+            # A raw description is only stored when its merchant key was not safe to share, so check it first
+            labels[i] = self.lookup(raw[i]) or (None if pinned[i] else self.lookup(keys[i]))
+            if labels[i] is None:
+                missing.append(i)
+
+        if missing:
+            raw_labels = matcher.categorize_unique([raw[i] for i in missing])
+            key_labels = matcher.categorize_unique([keys[i] for i in missing])
+            for i, raw_label, key_label in zip(missing, raw_labels, key_labels):
+                labels[i] = raw_label
+                # Share the answer across the merchant only if the stripped noise did not affect it and cannot for others
+                self.store(keys[i] if raw_label == key_label and not pinned[i] else raw[i], raw_label)
+
+        # Categorical result: one small code per row instead of a string object
+        label_codes = matcher.category_dtype.categories.get_indexer(labels)
+        return pd.Series(pd.Categorical.from_codes(label_codes[codes], dtype=matcher.category_dtype),
+                         index=descriptions.index, name='Category')
+
+    def save(self):
+        # Write the cache to disk if anything changed
+        if not self.dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Write a temporary file and swap it in, so parallel batch workers never read a half-written cache
+            temp_path = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'rules_hash': self.rules_hash, 'entries': self.entries}, f)
+            os.replace(temp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"Error saving category cache: {e}")
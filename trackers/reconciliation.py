@@ -0,0 +1,117 @@
+"""Cross-account transfer reconciliation: pair money leaving one account with the same amount arriving in another."""
+
+from collections import deque
+import numpy as np
+import pandas as pd
+from trackers.aggregation import MonthlyReport, monthly_category_totals
+from trackers.schema import CENTS_COLUMN
+
+DEFAULT_TOLERANCE_DAYS = 5  # Card payments post to the card a few days before they leave savings
+
+
+def slim_transactions(account, df, date_column):
+    # The columns reconciliation needs from a processed tracker frame, with the date column renamed to 'Date'
+    return pd.DataFrame({
+        'account': account,
+        'row': df.index,  # Row label in the tracker's frame
+        'Date': df[date_column].to_numpy(),
+        CENTS_COLUMN: df[CENTS_COLUMN].to_numpy(),
+        'Description': df['Description'].astype(object).to_numpy(),
+        'Category': df['Category'].astype(object).to_numpy(),
+    })
+
+
+def match_transfers(transactions, tolerance_days=DEFAULT_TOLERANCE_DAYS):
+    # Pair every outflow with an inflow of the same amount in another account within tolerance_days.
+    # Same-day pairs are taken first, then pairs one day apart and so on, so a transfer is not paired with a
+    # look-alike a few days off when its real counterpart exists. Returns (outflow positions, inflow positions).
+    cents = transactions[CENTS_COLUMN].to_numpy(dtype='float64', na_value=np.nan)
+    sizes = np.abs(cents)
+    dates = transactions['Date'].to_numpy(dtype='datetime64[ns]').view('int64')
+    accounts = transactions['account'].to_numpy()
+    # Only amounts seen both as money out and money in can pair up
+    shared = np.intersect1d(sizes[cents < 0], sizes[cents > 0])
+    candidates = np.flatnonzero(np.isin(sizes, shared))
+    candidates = candidates[np.lexsort((dates[candidates], sizes[candidates]))]  # Sorted by (amount, date) once
+
+    outflows, inflows = [], []
+    for days in range(tolerance_days + 1):
+        matched_out, matched_in = merge_pass(candidates, cents, sizes, dates, accounts, days * 86_400 * 10**9)
+        outflows += matched_out
+        inflows += matched_in
+        candidates = candidates[~np.isin(candidates, matched_out + matched_in)]  # Still in (amount, date) order
+    return np.array(outflows, dtype=np.intp), np.array(inflows, dtype=np.intp)
+
+
+def merge_pass(order, cents, sizes, dates, accounts, tolerance):
+    # One merge-like pass over rows sorted by (amount, date): pair each row with the earliest unmatched
+    # opposite-signed row of another account at most tolerance nanoseconds earlier
+    outflows, inflows = [], []
+    pending = {True: deque(), False: deque()}  # Unmatched rows of the current amount by sign, oldest first
+    current = None
+    for position, size, date, is_out, account in zip(order.tolist(), sizes[order].tolist(), dates[order].tolist(),
+                                                      (cents[order] < 0).tolist(), accounts[order].tolist()):
+        if size != current:
+            current = size
+            pending[True].clear()
+            pending[False].clear()
+        opposite = pending[not is_out]
+        while opposite and date - opposite[0][1] > tolerance:
+            opposite.popleft()  # Too old to pair with this row or any later one
+        for i, (other, _, other_account) in enumerate(opposite):
+            if other_account != account:  # A refund inside one account is not a transfer
+                del opposite[i]
+                outflows.append(position if is_out else other)
+                inflows.append(other if is_out else position)
+                break
+        else:
+            pending[is_out].append((position, date, account))
+    return outflows, inflows
+
+
+class Reconciliation:
+    def __init__(self, frames, tolerance_days=DEFAULT_TOLERANCE_DAYS):
+        # frames: (account, processed DataFrame, date column) for every account to reconcile
+        self.tolerance_days = tolerance_days
+        self.transactions = pd.concat([slim_transactions(*frame) for frame in frames], ignore_index=True)
+        self.outflows, self.inflows = match_transfers(self.transactions, tolerance_days)
+        self.matched = np.zeros(len(self.transactions), dtype=bool)  # True for both rows of every pair
+        self.matched[self.outflows] = True
+        self.matched[self.inflows] = True
+
+    @classmethod
+    def from_trackers(cls, trackers, tolerance_days=DEFAULT_TOLERANCE_DAYS):
+        # Reconcile trackers that have already run process_data
+        return cls([(tracker.account, tracker.df, tracker.date_column) for tracker in trackers], tolerance_days)
+
+    def pairs(self):
+        # One row per matched transfer: where it left, where it arrived, the amount and how many days it took
+        out, into = self.transactions.iloc[self.outflows], self.transactions.iloc[self.inflows]
+        return pd.DataFrame({
+            'from_account': out['account'].to_numpy(),
+            'from_date': out['Date'].to_numpy(),
+            'from_description': out['Description'].to_numpy(),
+            'to_account': into['account'].to_numpy(),
+            'to_date': into['Date'].to_numpy(),
+            'to_description': into['Description'].to_numpy(),
+            'amount': into[CENTS_COLUMN].to_numpy(dtype='int64') / 100,
+            'days': (into['Date'].to_numpy() - out['Date'].to_numpy()) // np.timedelta64(1, 'D'),
+        }).sort_values('from_date', kind='stable', ignore_index=True)
+
+    def matched_rows(self, account):
+        # Row labels of an account's transactions that are one side of a transfer
+        rows = self.transactions[self.matched & (self.transactions['account'] == account).to_numpy()]
+        return pd.Index(rows['row'])
+
+    def combined_totals(self):
+        # Monthly category totals of all accounts together, with both sides of every transfer left out
+        return monthly_category_totals(self.transactions[~self.matched], 'Date')
+
+    def combined_report(self):
+        return MonthlyReport(self.combined_totals())
+
+    def summary(self):
+        # One line about what was matched
+        total = self.transactions[CENTS_COLUMN].iloc[self.inflows].sum() / 100
+        return (f"Matched {len(self.inflows)} transfers (${total:,.2f}) between accounts within {self.tolerance_days} days; "
+                f"both sides are left out of the combined totals.")
@@ -0,0 +1,188 @@
+"""Recurring charges found from the transactions themselves, and rolling 7/30/90-day spend per category."""
+
+import bisect
+import sys
+import numpy as np
+import pandas as pd
+from trackers.merchant_cache import normalize_merchants
+from trackers.schema import CENTS_COLUMN
+
+# How the bank introduces a card charge; the same merchant is billed under either wording
+CHARGE_PREFIX_PATTERN = r'^(?:recurring payment|purchase) authorized on '
+# Billing periods, shortest first: (name, typical days, shortest and longest gap still counted as that period)
+PERIODS = [
+    ('weekly', 7, 6, 8),
+    ('biweekly', 14, 13, 16),
+    ('monthly', 30.4, 26, 35),
+    ('quarterly', 91, 84, 98),
+    ('yearly', 365, 350, 380),
+]
+AMOUNT_TOLERANCE = 0.15  # Amounts of one merchant this close (relative) are the same charge, e.g. after a price change
+ROLLING_WINDOWS = (7, 30, 90)  # Days covered by each rolling spend window
+
+
+def merchant_codes(descriptions):
+    # One code per transaction for its merchant, and the merchant names. Only distinct descriptions are normalized.
+    codes, uniques = pd.factorize(descriptions)
+    keys = normalize_merchants(pd.Series(uniques)).str.replace(CHARGE_PREFIX_PATTERN, '', regex=True)
+    key_codes, key_names = pd.factorize(pd.concat([keys, pd.Series([''], dtype=keys.dtype)], ignore_index=True))
+    return key_codes[codes], np.asarray(key_names, dtype=object)  # Missing descriptions (code -1) pick the trailing ''
+
+
+def amount_bands(merchants, cents):
+    # Band number of every charge: charges of one merchant whose amounts, sorted, are each within AMOUNT_TOLERANCE
+    # of the next belong to one band, so a price change (14.99 -> 16.99) keeps its series while unrelated
+    # purchases from the same merchant (0.99 and 9.99) stay apart
+    spend = -cents  # Charges are negative
+    order = np.lexsort((spend, merchants))
+    merchants, spend = merchants[order], spend[order]
+    starts = np.r_[True, (merchants[1:] != merchants[:-1]) | (spend[1:] > spend[:-1] * (1 + AMOUNT_TOLERANCE))]
+    bands = np.empty(len(order), dtype='int64')
+    bands[order] = np.cumsum(starts) - 1
+    return bands
+
+
+def period_multiples(gaps, shortest, longest):
+    # How many billing periods each gap spans: 1, or 2 when a single charge was skipped; 0 for neither
+    return np.where((gaps >= shortest) & (gaps <= longest), 1, np.where((gaps >= 2 * shortest) & (gaps <= 2 * longest), 2, 0))
+
+
+def billing_chain(days, cents, min_occurrences, regularity):
+    # Fallback for one series whose plain gaps are irregular because a second charge of about the same amount
+    # turns up between the billed ones (two subscriptions at one price, a one-off purchase). For each period,
+    # shortest first, keep every charge at least that period's shortest gap after the last kept one; the series
+    # recurs if the kept charges are regular and keep their price (see detect_recurring), and at most as many
+    # charges were passed over as kept. Returns (period index, kept positions, interval in days) or None.
+    span = days[-1] - days[0]
+    day_list = days.tolist()
+    for index, (_, _, shortest, longest) in enumerate(PERIODS):
+        if len(days) > 2 * (span / shortest + 1):
+            continue  # More than two charges per period (daily coffee, groceries) can never pass
+        kept = [0]
+        while True:  # Jump straight to the next charge far enough along, one step per kept charge
+            position = bisect.bisect_left(day_list, day_list[kept[-1]] + shortest)
+            if position == len(day_list):
+                break
+            kept.append(position)
+        if len(kept) < min_occurrences or len(days) - len(kept) > len(kept):
+            continue
+        gaps = np.diff(days[kept])
+        multiples = period_multiples(gaps, shortest, longest)
+        if (multiples > 0).mean() >= regularity and (np.diff(cents[kept]) == 0).mean() >= regularity:
+            return index, kept, float(np.median(gaps[multiples > 0] / multiples[multiples > 0]))
+    return None
+
+
+def detect_recurring(df, date_column, min_occurrences=3, regularity=0.75):
+    # Charges billed again and again by the same merchant for about the same amount at a regular period.
+    # A series is every charge of one merchant amount band (see amount_bands); it is recurring when it has
+    # min_occurrences charges, its median gap falls in one of PERIODS and at least `regularity` of its gaps do
+    # too, a gap of two periods (one skipped charge) included, and at least as large a share of its charges cost
+    # the same as the one before: a price can change now and then, a grocery bill changes every time. This runs
+    # on whole arrays: one sort, then gaps and per-series statistics with diff and bincount. Series that fail only
+    # because of extra charges in between get a second look from billing_chain.
+    cents = df[CENTS_COLUMN].to_numpy(dtype='float64', na_value=np.nan)
+    dates = df[date_column].to_numpy(dtype='datetime64[ns]')
+    charges = np.flatnonzero((cents < 0) & ~np.isnat(dates))  # Spending only
+    merchants, merchant_names = merchant_codes(df['Description'].iloc[charges])
+    cents, dates = cents[charges].astype('int64'), dates[charges]
+    bands = amount_bands(merchants, cents)
+
+    # Sort by (band, date) so every series is one contiguous, date-ordered run
+    order = np.lexsort((dates, bands))
+    bands, merchants, cents, dates, charges = bands[order], merchants[order], cents[order], dates[order], charges[order]
+    starts = np.r_[True, bands[1:] != bands[:-1]][:len(bands)]  # Empty when there are no charges
+    series = np.cumsum(starts) - 1
+    series_count = series[-1] + 1 if len(series) else 0
+    occurrences = np.bincount(series, minlength=series_count)
+    first = np.flatnonzero(starts)  # Position of each series' first and last charge
+    last = np.r_[first[1:], len(series)][:len(first)] - 1
+
+    # Gaps in days between consecutive charges of the same series
+    gaps = np.diff(dates) / np.timedelta64(1, 'D')
+    same = ~starts[1:]
+    gaps, gap_series = gaps[same], series[1:][same]
+    median_gap = pd.Series(gaps).groupby(gap_series).median().reindex(range(series_count)).to_numpy()
+
+    # The period whose range holds the median gap (-1 for none), then the share of gaps of one or two periods
+    shortest = np.array([period[2] for period in PERIODS])
+    longest = np.array([period[3] for period in PERIODS])
+    period = np.searchsorted(shortest, median_gap, side='right') - 1
+    period[(period < 0) | (median_gap > longest[period.clip(0)]) | np.isnan(median_gap)] = -1
+    gap_period = period[gap_series].clip(0)
+    in_period = period_multiples(gaps, shortest[gap_period], longest[gap_period]) > 0
+    regular = np.bincount(gap_series, weights=in_period, minlength=series_count) / np.maximum(occurrences - 1, 1)
+    same_price = np.bincount(gap_series, weights=(cents[1:] == cents[:-1])[same], minlength=series_count) / np.maximum(occurrences - 1, 1)
+    found = (period >= 0) & (occurrences >= min_occurrences) & (regularity <= regular) & (regularity <= same_price)
+
+    # Second look at the remaining long enough series, on the charges that look billed. The chain is greedy and
+    # runs series by series, so first rule out on whole arrays the series it can never accept: ones with more than
+    # two charges per shortest period, and ones without enough repeated amounts for the kept charges to keep their
+    # price (each kept pair at the same price is two charges whose amount turns up again in the series, and at
+    # least half the charges are kept). On a large history that leaves a handful of series instead of thousands.
+    days = dates.astype('datetime64[D]').astype('int64')
+    span = days[last] - days[first]
+    by_amount = np.lexsort((cents, series))
+    amount_starts = np.flatnonzero(np.r_[True, (series[by_amount][1:] != series[by_amount][:-1]) | (cents[by_amount][1:] != cents[by_amount][:-1])][:len(series)])
+    amount_counts = np.diff(np.r_[amount_starts, len(series)])
+    repeated = np.bincount(series[by_amount][amount_starts], weights=amount_counts * (amount_counts > 1), minlength=series_count)
+    fewest_kept = np.maximum(min_occurrences, (occurrences + 1) // 2)
+    same_pairs = np.ceil(regularity * (fewest_kept - 1))
+    chainable = (occurrences <= 2 * (span / PERIODS[0][2] + 1)) & ((same_pairs == 0) | (repeated > same_pairs))
+    for number in np.flatnonzero(~found & (occurrences >= min_occurrences) & chainable):
+        run = slice(first[number], last[number] + 1)
+        chain = billing_chain(days[run], cents[run], min_occurrences, regularity)
+        if chain is not None:
+            period[number], kept, median_gap[number] = chain
+            first[number], last[number] = first[number] + kept[0], first[number] + kept[-1]
+            occurrences[number] = len(kept)
+            found[number] = True
+    recurring = np.flatnonzero(found)
+
+    # One row per recurring series, described by its latest charge, whose amount is the current price
+    first, last = first[recurring], last[recurring]
+    latest = df.iloc[charges[last]]
+    typical_days = np.array([p[1] for p in PERIODS])[period[recurring]]
+    result = pd.DataFrame({
+        'merchant': merchant_names[merchants[last]],
+        'amount': cents[last] / 100,
+        'period': np.array([p[0] for p in PERIODS], dtype=object)[period[recurring]],
+        'interval_days': median_gap[recurring],
+        'occurrences': occurrences[recurring],
+        'first': dates[first],
+        'last': dates[last],
+        'next_expected': dates[last] + np.round(median_gap[recurring]).astype('timedelta64[D]'),
+        'yearly_cost': np.round(cents[last] * 365 / typical_days) / 100,
+        'category': latest['Category'].astype(object).to_numpy(),
+        'description': latest['Description'].astype(object).to_numpy(),
+    })
+    return result.sort_values('yearly_cost', kind='stable', ignore_index=True)  # Most expensive first (costs are negative)
+
+
+def rolling_category_spend(df, date_column, windows=ROLLING_WINDOWS):
+    # Spending per category over the trailing 7, 30 and 90 days of every calendar day, in cents (negative, like
+    # the report's spent totals). Columns are (window, Category), e.g. ('30d', 'food'). Daily totals are summed
+    # once, then each window is a difference of running sums, which stays exact in integer cents.
+    valid = df[df[date_column].notna()]
+    spent = valid[CENTS_COLUMN].fillna(0).to_numpy(dtype='int64').clip(max=0)
+    days = valid[date_column].dt.normalize()
+    daily = pd.Series(spent, index=valid.index).groupby([days, valid['Category']], observed=True).sum().unstack(fill_value=0)
+    if len(daily):
+        daily = daily.reindex(pd.date_range(daily.index.min(), daily.index.max(), freq='D'), fill_value=0)  # Days without spending too
+    daily.index.name = date_column
+    daily.columns = pd.Index(daily.columns.astype(object), name='Category')
+    running = daily.cumsum()
+    return pd.concat({f'{window}d': running - running.shift(window, fill_value=0) for window in windows},
+                     axis=1, names=['window', 'Category'])
+
+
+if __name__ == "__main__":
+    # Print the recurring charges and the latest rolling spend of one export (python -m trackers.recurring path/to/file.csv)
+    from trackers.registry import tracker_for_file
+    tracker_class, file_format = tracker_for_file(sys.argv[1])
+    tracker = tracker_class(sys.argv[1], file_format=file_format)
+    tracker.process_data()
+    pd.set_option('display.width', None)
+    print(tracker.recurring_charges().drop(columns='description').to_string(index=False))
+    latest = tracker.rolling_spend().iloc[-1].unstack('window') / 100
+    print(f"\nSpending up to {tracker.df[tracker.date_column].max():%Y-%m-%d}:\n{latest.to_string()}")
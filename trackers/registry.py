@@ -0,0 +1,56 @@
+"""Registry of account trackers. Tracker modules (and pandas) are only imported the first time an account type is used."""
+
+import importlib
+from pathlib import Path
+
+# Account keyword (also looked for in file names) -> tracker class, or "module:ClassName" until it is first used
+TRACKERS = {
+    'checking': 'trackers.Checking_tracker:CheckingTracker',
+    'credit': 'trackers.Credit_tracker:CreditTracker',
+    'savings': 'trackers.Savings_tracker:SavingsTracker',
+}
+
+
+def register_tracker(keyword, tracker=None):
+    # Register a tracker class (or a lazy "module:ClassName" string) for files whose name contains keyword.
+    # Without a tracker this returns a decorator, so a new tracker class can register itself.
+    if tracker is None:
+        def decorator(cls):
+            TRACKERS[keyword.lower()] = cls
+            return cls
+        return decorator
+    TRACKERS[keyword.lower()] = tracker
+    return tracker
+
+
+def load_tracker(keyword):
+    # Return the tracker class for an account keyword, importing its module on first use
+    tracker = TRACKERS[keyword]
+    if isinstance(tracker, str):
+        module_name, class_name = tracker.split(':')
+        tracker = getattr(importlib.import_module(module_name), class_name)
+        TRACKERS[keyword] = tracker  # Later lookups skip the import
+    return tracker
+
+
+def get_tracker_class(file_name):
+    # Determine the appropriate tracker class based on the file name (tracker_for_file also looks at the contents)
+    for keyword in TRACKERS:
+        if keyword in file_name.lower():
+            return load_tracker(keyword)
+    return None
+
+
+def tracker_for_file(file_path):
+    # Determine the tracker class and FileFormat of a CSV from its first few KB: the layout from its rows and the
+    # account from whichever account's rules match its descriptions, falling back to the file name when the contents
+    # are not clear. When the layout cannot be sniffed the bank's own layout is assumed and only the name decides.
+    # Returns (None, file_format) when neither tells the account.
+    from trackers.sniff import BANK_FORMAT, sniff  # Account detection loads the trackers' rules, so only when a file is opened
+    try:
+        file_format = sniff(file_path)
+    except ValueError:
+        return get_tracker_class(Path(file_path).stem), BANK_FORMAT
+    if file_format.account is not None:
+        return load_tracker(file_format.account), file_format
+    return get_tracker_class(Path(file_path).stem), file_format
@@ -0,0 +1,65 @@
+"""Index from each keyword pattern to the descriptions it matched, so rule edits only re-score what they touch."""
+
+import re
+import numpy as np
+import pandas as pd
+from trackers.categorizer import factorize_descriptions
+
+
+class RuleIndex:
+    def __init__(self, matcher, descriptions):
+        # Scan every distinct description once with the current rules and remember which patterns hit it
+        self.matcher = matcher
+        self.index = descriptions.index  # Row labels, so results line up however the frame is sorted later
+        self.codes, uniques = factorize_descriptions(descriptions)
+        self.descriptions = [description.lower() for description in uniques]  # Matched in lowercase like the cache
+        hits = matcher.match_matrix(self.descriptions)
+        # Pattern -> positions in self.descriptions it matched. Patterns that get removed are kept, since their
+        # hits only depend on the text, so switching a rule back and forth never scans twice.
+        self.pattern_rows = {pattern: np.flatnonzero(hits[:, column]) for column, pattern in enumerate(matcher.patterns)}
+        self.scores = hits.astype(np.int32) @ matcher.weights  # Hit count per distinct description and category
+        self.winners = matcher.winners(self.scores)  # Winning category position per distinct description
+
+    def rows_matching(self, pattern):
+        # Positions of the descriptions a pattern matches, scanning for it only the first time
+        if pattern not in self.pattern_rows:
+            search = re.compile(pattern, re.IGNORECASE).search
+            self.pattern_rows[pattern] = np.flatnonzero([search(description) is not None for description in self.descriptions])
+        return self.pattern_rows[pattern]
+
+    def update(self, matcher):
+        # Switch to new rules: apply the weight change of every added, removed or moved pattern to the
+        # descriptions it matches and pick new winners for those only. Returns how many transactions changed category.
+        old = self.matcher
+        old_labels = old.labels[self.winners]
+
+        # Carry the score columns over by category name; categories that are gone drop their column
+        carried = np.array([old.category_names.index(name) if name in old.category_names else -1 for name in matcher.category_names], dtype=np.intp)
+        scores = np.zeros((len(self.descriptions), len(matcher.category_names)), dtype=np.int32)
+        kept = carried >= 0
+        scores[:, kept] = self.scores[:, carried[kept]]
+
+        affected = []
+        for pattern in dict.fromkeys(old.patterns + matcher.patterns):  # Every pattern of either rule set, in order
+            old_weights = np.where(kept, old.pattern_weights(pattern)[carried], 0)
+            delta = matcher.pattern_weights(pattern) - old_weights
+            if delta.any():
+                rows = self.rows_matching(pattern)
+                scores[rows] += delta
+                affected.append(rows)
+
+        self.scores = scores
+        if matcher.category_names != old.category_names:
+            # Category positions (and tie order) changed, so every winner is re-picked; this is arithmetic only, no regex
+            self.winners = matcher.winners(scores)
+        elif affected:
+            rows = np.unique(np.concatenate(affected))
+            self.winners[rows] = matcher.winners(scores[rows])
+        self.matcher = matcher
+        return int((old_labels != matcher.labels[self.winners])[self.codes].sum())
+
+    def categories(self):
+        # Category of every indexed transaction under the current rules, in the Category column's dtype
+        label_codes = self.matcher.category_dtype.categories.get_indexer(self.matcher.labels)[self.winners]
+        return pd.Series(pd.Categorical.from_codes(label_codes[self.codes], dtype=self.matcher.category_dtype),
+                         index=self.index, name='Category')
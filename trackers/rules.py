@@ -0,0 +1,45 @@
+"""Category rules kept outside the code: one JSON (or YAML) file per account in the rules directory."""
+
+import importlib.util
+import json
+import os
+from pathlib import Path
+
+RULES_DIR = Path(__file__).resolve().parent.parent / 'rules'  # rules/<account>.json next to the trackers
+RULE_SUFFIXES = ('.json', '.yaml', '.yml')  # Looked for in this order
+YAML_AVAILABLE = importlib.util.find_spec('yaml') is not None  # YAML rule files need PyYAML; JSON always works
+
+
+def rules_file(account, rules_dir=RULES_DIR):
+    # Path of an account's rule file, whichever supported format it is written in
+    for suffix in RULE_SUFFIXES:
+        path = Path(rules_dir) / f'{account}{suffix}'
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"No rule file for '{account}' in {rules_dir} (expected {account}.json)")
+
+
+def load_rules(path):
+    # Read a rule file into the categories dict the trackers use: category -> list of regex keywords.
+    # File order is kept, since the first category wins ties.
+    path = Path(path)
+    with open(path, encoding='utf-8') as f:
+        if path.suffix == '.json':
+            categories = json.load(f)
+        elif not YAML_AVAILABLE:
+            raise ValueError(f"{path.name}: reading YAML rule files needs PyYAML (pip install pyyaml), or use JSON")
+        else:
+            import yaml
+            categories = yaml.safe_load(f)
+    if not isinstance(categories, dict) or not all(isinstance(keywords, list) and all(isinstance(keyword, str) for keyword in keywords)
+                                                   for keywords in categories.values()):
+        raise ValueError(f"{path.name}: rules must map each category to a list of keyword patterns")
+    return categories
+
+
+def rules_mtime(path):
+    # Modification time used to notice edits to a rule file (None if it has gone missing)
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
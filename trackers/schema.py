@@ -0,0 +1,46 @@
+"""Compact column types of a processed transaction table: integer cents, Arrow or categorical text and categorical months."""
+
+import importlib.util
+import numpy as np
+import pandas as pd
+
+CENTS_COLUMN = 'AmountCents'  # Amounts are kept as whole cents so sums are exact
+MONEY_COLUMNS = ['spent', 'income', 'net']  # Totals columns that hold cents
+# Arrow strings keep all text in one buffer instead of a Python object per row, and their string methods run in C++
+TEXT_DTYPE = 'string[pyarrow]' if importlib.util.find_spec('pyarrow') is not None else str
+# Without pyarrow, a categorical at least stores each distinct description once
+DESCRIPTION_DTYPE = TEXT_DTYPE if TEXT_DTYPE != str else 'category'
+
+
+def to_cents(amounts):
+    # Dollar amounts as exact integer cents; missing amounts stay missing (nullable Int64)
+    cents = np.round(pd.to_numeric(amounts).to_numpy(dtype='float64') * 100)
+    return pd.Series(pd.array(cents, dtype='Int64'), index=amounts.index, name=CENTS_COLUMN)
+
+
+def to_dollars(cents):
+    # Integer cents back to float dollars for display; missing amounts become NaN
+    return pd.Series(cents.to_numpy(dtype='float64', na_value=np.nan) / 100, index=cents.index, name='Amount')
+
+
+def category_dtype(category_names):
+    # Categorical dtype for the Category column; alphabetical so sorting by codes sorts by name
+    return pd.CategoricalDtype(sorted(set(category_names)))
+
+
+def month_column(dates):
+    # Month of every transaction as a categorical of Periods: one small code per row
+    return dates.dt.to_period('M').astype('category').rename('YearMonth')
+
+
+def compact_descriptions(descriptions):
+    # Descriptions in DESCRIPTION_DTYPE, converting only when they are not already
+    return descriptions if descriptions.dtype == DESCRIPTION_DTYPE else descriptions.astype(DESCRIPTION_DTYPE)
+
+
+def compact_frame(df):
+    # Convert a frame with a float Amount and text Description to the compact schema, in place
+    if 'Amount' in df:
+        df[CENTS_COLUMN] = to_cents(df.pop('Amount'))
+    df['Description'] = compact_descriptions(df['Description'])
+    return df
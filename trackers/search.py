@@ -0,0 +1,161 @@
+"""Search over processed transactions: an inverted token index on descriptions plus sorted date and amount indexes."""
+
+import re
+import numpy as np
+import pandas as pd
+from trackers.merchant_cache import normalize_merchants
+from trackers.schema import CENTS_COLUMN
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')  # Words and numbers in a lowercased description
+AMOUNT_FILTER = re.compile(r'^(>=|<=|>|<)\$?(\d+(?:\.\d+)?)$')  # >100, <=25.50, >$20
+
+
+def grouped_positions(codes, group_count):
+    # (order, starts) so that order[starts[g]:starts[g + 1]] are the positions whose code is g
+    order = np.argsort(codes, kind='stable')
+    starts = np.searchsorted(codes[order], np.arange(group_count + 1))
+    return order, starts
+
+
+def expand(order, starts, groups):
+    # Positions of every member of the given groups, without touching the other groups
+    lengths = starts[groups + 1] - starts[groups]
+    offsets = np.repeat(starts[groups] - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    return order[offsets]
+
+
+def parse_query(text):
+    # Search box text -> search() arguments. Plain words match merchant words by prefix (the description
+    # without its dates, store and reference numbers); filters are >100 / <=25 (dollar size of the amount),
+    # from:2024-01-01, to:2024-03-31, month:2024-02 and cat:food.
+    filters = {'terms': []}
+    for part in text.split():
+        key, _, value = part.partition(':')
+        amount = AMOUNT_FILTER.match(part)
+        if amount:
+            operator, dollars = amount.groups()
+            filters['min_amount' if operator.startswith('>') else 'max_amount'] = float(dollars) + (0.01 if operator == '>' else -0.01 if operator == '<' else 0)
+        elif value and key.lower() in ('from', 'to', 'month'):
+            filters[{'from': 'start', 'to': 'end', 'month': 'month'}[key.lower()]] = value
+        elif value and key.lower() in ('cat', 'category'):
+            filters['category'] = value.replace('_', ' ')  # cat:credit_card_payment for names with spaces
+        else:
+            filters['terms'].append(part)
+    return filters
+
+
+def date_mask(dates, low=None, high=None):
+    # Which dates fall between low and high (both inclusive, None for an open side); missing dates never do
+    mask = ~np.isnat(dates)
+    if low is not None:
+        mask &= dates >= low
+    if high is not None:
+        mask &= dates <= high
+    return mask
+
+
+class TransactionIndex:
+    def __init__(self, df, date_column):
+        # Build every index once; searches then only touch the rows they return
+        self.length = len(df)
+
+        # Inverted index: sorted merchant words -> merchant keys containing them -> rows. Descriptions are
+        # reduced to merchant keys first, so only a few thousand distinct keys are tokenized, however long the history.
+        codes, uniques = pd.factorize(df['Description'])
+        keys = normalize_merchants(pd.Series(uniques))
+        key_codes, key_names = pd.factorize(pd.concat([keys, pd.Series([''], dtype=keys.dtype)], ignore_index=True))
+        self.row_keys = key_codes[codes]  # Missing descriptions (code -1) pick the trailing ''
+        self.key_order, self.key_starts = grouped_positions(self.row_keys, len(key_names))
+        words = pd.Series(list(key_names), dtype=object).str.findall(TOKEN_PATTERN).explode().dropna()
+        word_codes, words_sorted = pd.factorize(words, sort=True)
+        self.words = np.asarray(words_sorted, dtype=object)  # Sorted, so a prefix is a contiguous range
+        self.word_order, self.word_starts = grouped_positions(word_codes, len(self.words))
+        self.word_keys = words.index.to_numpy()  # Merchant key of every (word, key) pair
+
+        # Sorted indexes: a range query is two binary searches and a slice
+        self.dates = df[date_column].to_numpy(dtype='datetime64[ns]')
+        self.date_order = np.argsort(self.dates, kind='stable')
+        self.sorted_dates = self.dates[self.date_order]
+        self.dated = int((~np.isnat(self.sorted_dates)).sum())  # Missing dates sort last and never match a date filter
+        self.amounts = np.abs(df[CENTS_COLUMN].to_numpy(dtype='float64', na_value=np.nan))  # Size in cents; sign is spend vs income
+        self.amount_order = np.argsort(self.amounts, kind='stable')  # Missing amounts sort last
+        self.sorted_amounts = self.amounts[self.amount_order]
+
+        # Category -> rows
+        self.category_names = df['Category'].cat.categories
+        self.category_codes = df['Category'].cat.codes.to_numpy()
+        self.category_order, self.category_starts = grouped_positions(self.category_codes, len(self.category_names))
+
+    def matching_keys(self, term):
+        # Merchant keys with a word starting with term (every word of a multi-word term)
+        matched = None
+        for word in TOKEN_PATTERN.findall(term.lower()):
+            low, high = np.searchsorted(self.words, [word, word + '\uffff'])
+            found = np.unique(self.word_keys[self.word_order[self.word_starts[low]:self.word_starts[high]]])
+            matched = found if matched is None else np.intersect1d(matched, found, assume_unique=True)
+        return matched
+
+    def search(self, terms=(), start=None, end=None, month=None, min_amount=None, max_amount=None, category=None):
+        # Row positions (ascending) matching every given filter. Each filter knows its match count from
+        # its index alone; only the most selective one is expanded to rows and the others are checked on those rows.
+        filters = []  # (match count, rows, keep(rows) -> mask)
+
+        for term in terms:
+            keys = self.matching_keys(term)
+            if keys is None:
+                continue  # Only punctuation
+            wanted = np.zeros(len(self.key_starts) - 1, dtype=bool)
+            wanted[keys] = True
+            count = int((self.key_starts[keys + 1] - self.key_starts[keys]).sum())
+            filters.append((count, lambda k=keys: expand(self.key_order, self.key_starts, k),
+                            lambda rows, w=wanted: w[self.row_keys[rows]]))
+
+        if month is not None:
+            period = pd.Period(month, freq='M')
+            start, end = period.start_time, period.end_time
+        if start is not None or end is not None:
+            # Only the bounds that were given are converted; an open side is the start or end of the sorted dates
+            # (pd.Timestamp.min/max do not fit datetime64[ns] and would wrap around)
+            low_date = np.datetime64(pd.Timestamp(start), 'ns') if start is not None else None
+            high_date = None
+            if end is not None:
+                high_date = pd.Timestamp(end)
+                if high_date == high_date.normalize():
+                    high_date += pd.Timedelta(days=1) - pd.Timedelta(1)  # A bare end date includes that whole day
+                high_date = np.datetime64(high_date, 'ns')
+            low = np.searchsorted(self.sorted_dates, low_date, 'left') if low_date is not None else 0
+            high = np.searchsorted(self.sorted_dates, high_date, 'right') if high_date is not None else self.dated
+            filters.append((high - low, lambda l=low, h=high: self.date_order[l:h],
+                            lambda rows, l=low_date, h=high_date: date_mask(self.dates[rows], l, h)))
+
+        if min_amount is not None or max_amount is not None:
+            low_cents = round(min_amount * 100) if min_amount is not None else -np.inf
+            high_cents = round(max_amount * 100) if max_amount is not None else np.inf
+            low, high = np.searchsorted(self.sorted_amounts, low_cents, 'left'), np.searchsorted(self.sorted_amounts, high_cents, 'right')
+            filters.append((high - low, lambda l=low, h=high: self.amount_order[l:h],
+                            lambda rows, l=low_cents, h=high_cents: (self.amounts[rows] >= l) & (self.amounts[rows] <= h)))
+
+        if category is not None:
+            names = [name.lower() for name in self.category_names]
+            if category.lower() not in names:
+                return np.array([], dtype=np.intp)  # Unknown category: nothing matches
+            code = names.index(category.lower())
+            filters.append((int(self.category_starts[code + 1] - self.category_starts[code]),
+                            lambda c=code: expand(self.category_order, self.category_starts, np.array([c])),
+                            lambda rows, c=code: self.category_codes[rows] == c))
+
+        if not filters:
+            return np.arange(self.length)
+        filters.sort(key=lambda item: item[0])
+        rows = filters[0][1]()
+        for _, _, keep in filters[1:]:
+            if not len(rows):
+                break
+            rows = rows[keep(rows)]
+        return np.sort(rows)
+
+    def query(self, text, **filters):
+        # Search with a search box string, e.g. "wdw >100 from:2024-01-01"; extra keyword filters are added to it
+        parsed = parse_query(text)
+        parsed.update(filters)
+        return self.search(**parsed)
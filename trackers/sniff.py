@@ -0,0 +1,165 @@
+"""Format sniffing: tell a statement export's layout, delimiter, date format and account from its first few KB."""
+
+import csv
+import re
+from collections import Counter
+from datetime import datetime
+
+SNIFF_BYTES = 8192  # Enough for ~100 transactions of the bank export
+DELIMITERS = ',;\t|'
+# Tried in this order; month-first comes before day-first, so a date like 03/04 reads as March 4 unless a day > 12 rules it out
+DATE_FORMATS = ['%m/%d/%Y', '%Y-%m-%d', '%Y/%m/%d', '%d/%m/%Y', '%m/%d/%y', '%d/%m/%y', '%d.%m.%Y']
+MIN_SHARE = 0.9  # Share of a sampled column's values that must fit for it to count as the date or amount column
+AMOUNT_PATTERN = re.compile(r'^\(?-?\$?-?([\d,]*\.?|[\d.]*,?)\d+\)?$')  # -8.45, 1,234.56, $20, (15.00), -10,00, 1.234,56
+# A separator followed by one or two digits at the end is a decimal one; "1,234" or "1.234" could be either
+DECIMAL_ENDINGS = {'.': re.compile(r'\.\d{1,2}\)?$'), ',': re.compile(r',\d{1,2}\)?$')}
+
+
+class FileFormat:
+    def __init__(self, delimiter=',', header=False, date_index=0, amount_index=1, description_index=4,
+                 date_format='%m/%d/%Y', account=None, decimal='.'):
+        self.delimiter = delimiter
+        self.header = header  # Whether the first line holds column names rather than a transaction
+        self.date_index = date_index  # Positions of the three columns the trackers use
+        self.amount_index = amount_index
+        self.description_index = description_index
+        self.date_format = date_format
+        self.account = account  # Registry keyword of the account the contents look like, or None when unsure
+        self.decimal = decimal  # '.' for -8.45, ',' for European exports that write -8,45 (and 1.234,56)
+
+    def columns(self, date_column):
+        # (usecols, names) for read_csv: the used column positions in file order and the names to give them
+        named = sorted([(self.date_index, date_column), (self.amount_index, 'Amount'), (self.description_index, 'Description')])
+        return [index for index, _ in named], [name for _, name in named]
+
+    def __repr__(self):
+        return (f"FileFormat(delimiter={self.delimiter!r}, header={self.header}, date_index={self.date_index}, "
+                f"amount_index={self.amount_index}, description_index={self.description_index}, "
+                f"date_format={self.date_format!r}, account={self.account!r}, decimal={self.decimal!r})")
+
+
+BANK_FORMAT = FileFormat()  # The bank's 5-column export: "MM/DD/YYYY","-8.45","*","","DESCRIPTION"
+
+
+def read_sample(file_path, sniff_bytes=SNIFF_BYTES):
+    # The first complete lines of a file, decoded; a line cut off by the byte limit is dropped
+    with open(file_path, 'rb') as f:
+        data = f.read(sniff_bytes + 1)
+    text = data[:sniff_bytes].decode('utf-8-sig', errors='replace')
+    lines = text.splitlines()
+    if len(data) > sniff_bytes and lines:
+        lines.pop()
+    return [line for line in lines if line.strip()]
+
+
+def date_format_of(values, share=MIN_SHARE):
+    # The one of DATE_FORMATS that parses the most values (the earliest on ties), if it parses at least share of them.
+    # Counting rather than stopping at the first good enough format keeps day-first exports with only a few days
+    # past the 12th from being read month-first.
+    best, best_parsed = None, 0
+    for date_format in DATE_FORMATS:
+        parsed = 0
+        for value in values:
+            try:
+                datetime.strptime(value.strip(), date_format)
+                parsed += 1
+            except ValueError:
+                pass
+        if parsed > best_parsed:
+            best, best_parsed = date_format, parsed
+    return best if values and best_parsed >= share * len(values) else None
+
+
+def is_amount(value):
+    # Whether a field looks like a money amount
+    return AMOUNT_PATTERN.match(value.replace(' ', '')) is not None
+
+
+def amount_share(rows, index):
+    # Share of the non-empty values in a column that look like amounts (0 for an empty column)
+    values = [row[index] for row in rows if row[index].strip()]
+    return sum(is_amount(value) for value in values) / len(values) if values else 0.0
+
+
+def decimal_of(values):
+    # The decimal separator of sampled amounts: ',' when some end in ,dd and none in .dd, '.' otherwise.
+    # Raises ValueError when both appear, since either reading would be off by 100x for some rows.
+    found = {mark for mark, ending in DECIMAL_ENDINGS.items() if any(ending.search(value.strip()) for value in values)}
+    if len(found) > 1:
+        raise ValueError("amounts mix decimal points and decimal commas")
+    return found.pop() if found else '.'
+
+
+def sniff_layout(file_path, sniff_bytes=SNIFF_BYTES):
+    # Find the delimiter, header line, date/amount/description columns, date format and decimal separator from a sample.
+    # A few bad rows (an impossible date, a garbled amount) do not matter: a column only needs MIN_SHARE of its
+    # values to fit, and the reader turns the rest into NaT/NaN as usual. Raises ValueError when the sample does
+    # not look like a transaction export.
+    lines = read_sample(file_path, sniff_bytes)
+    if not lines:
+        raise ValueError(f"{file_path}: file is empty")
+    sample = '\n'.join(lines)
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        delimiter = ','
+    rows = list(csv.reader(lines, delimiter=delimiter))
+    width = Counter(len(row) for row in rows).most_common(1)[0][0]
+    rows = [row for row in rows if len(row) == width]
+
+    # Columns are judged on the rows after the first, which may be a header
+    data = rows[1:] if len(rows) > 1 else rows
+    for date_index in range(width):
+        date_format = date_format_of([row[date_index] for row in data if row[date_index].strip()])
+        if date_format is not None:
+            break
+    else:
+        raise ValueError(f"{file_path}: no date column found")
+    # Amount: the first other column that is mostly numbers; description: the longest remaining text
+    others = [index for index in range(width) if index != date_index]
+    amounts = [index for index in others if amount_share(data, index) >= MIN_SHARE]
+    if not amounts:
+        raise ValueError(f"{file_path}: no amount column found")
+    amount_index = amounts[0]
+    # The first line is a header when neither its date nor its amount fits; one bad transaction still has the other
+    first = rows[0]
+    header = len(rows) > 1 and date_format_of([first[date_index]]) is None and not is_amount(first[amount_index])
+    if not header:
+        data = rows
+    texts = [index for index in others if index != amount_index]
+    if not texts:
+        raise ValueError(f"{file_path}: no description column found")
+    description_index = max(texts, key=lambda index: sum(len(row[index]) for row in data))
+    try:
+        decimal = decimal_of([row[amount_index] for row in data if is_amount(row[amount_index])])
+    except ValueError as e:
+        raise ValueError(f"{file_path}: {e}")
+    file_format = FileFormat(delimiter, header, date_index, amount_index, description_index, date_format, decimal=decimal)
+    return file_format, [row[description_index] for row in data]
+
+
+def detect_account(descriptions):
+    # Registry keyword whose rules categorize the most sampled descriptions, or None when no account stands
+    # out (nothing matched, or a tie). Each account's own keyword rules are the evidence.
+    from trackers.categorizer import CategoryMatcher, OTHER_CATEGORY
+    from trackers.registry import TRACKERS, load_tracker
+    from trackers.rules import load_rules, rules_file
+    lowered = [description.lower() for description in descriptions]
+    scores = {}
+    for keyword in TRACKERS:
+        try:
+            matcher = CategoryMatcher(load_rules(rules_file(load_tracker(keyword).account)))
+        except (OSError, ValueError):
+            continue  # A tracker without usable rules can still be picked by file name, and reports its rules when built
+        scores[keyword] = int((matcher.categorize_unique(lowered) != OTHER_CATEGORY).sum())
+    ranked = sorted(scores.values(), reverse=True)
+    if not ranked or ranked[0] == 0 or (len(ranked) > 1 and ranked[0] == ranked[1]):
+        return None
+    return max(scores, key=scores.get)
+
+
+def sniff(file_path, sniff_bytes=SNIFF_BYTES):
+    # Full format of a file: its layout plus the account its contents look like
+    file_format, descriptions = sniff_layout(file_path, sniff_bytes)
+    file_format.account = detect_account(descriptions)
+    return file_format
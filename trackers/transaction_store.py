@@ -0,0 +1,156 @@
+"""Local SQLite store of every imported transaction and their monthly totals, so overlapping bank exports are only processed once."""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+import pandas as pd
+from trackers.aggregation import TOTAL_COLUMNS, empty_totals, monthly_category_totals
+from trackers.schema import CENTS_COLUMN, to_dollars
+
+STORE_FILE_NAME = 'transactions.sqlite'  # Kept next to the CSV exports
+
+# monthly_totals rows of the stored transactions, (account, month, category, *TOTAL_COLUMNS), for rebuilding the table.
+# Amounts are stored in dollars, so they are rounded back to cents first; missing amounts count as zero.
+TOTALS_FROM_TRANSACTIONS = """
+    SELECT account, substr(date, 1, 7), category, SUM(MIN(cents, 0)), SUM(MAX(cents, 0)), SUM(cents), SUM(cents < 0), COUNT(*)
+    FROM (SELECT account, date, category, CAST(ROUND(COALESCE(amount, 0) * 100) AS INTEGER) AS cents FROM transactions {where})
+    GROUP BY account, substr(date, 1, 7), category
+"""
+
+
+def transaction_ids(df, date_column, account):
+    # Stable id for each row from its account, date, amount and description.
+    # Identical purchases on the same day are told apart by their position among the duplicates,
+    # which stays the same in every export that covers that day.
+    dates = df[date_column].dt.strftime('%Y-%m-%d')
+    amounts = to_dollars(df[CENTS_COLUMN]).map('{:.2f}'.format)
+    descriptions = df['Description'].astype(object).fillna('').astype(str)
+    occurrence = df.groupby([dates, amounts, descriptions], sort=False).cumcount().astype(str)
+    keys = account + '|' + dates + '|' + amounts + '|' + descriptions + '|' + occurrence
+    return keys.map(lambda key: hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest())
+
+
+class TransactionStore:
+    def __init__(self, path):
+        self.path = Path(path)  # SQLite database file
+        self.connection = None  # Opened on first use
+
+    def connect(self):
+        # Open the database, creating the tables the first time
+        if self.connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(self.path)
+            has_totals = self.connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'monthly_totals'").fetchone() is not None
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS transactions (
+                    txn_id TEXT PRIMARY KEY,
+                    account TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    amount REAL,
+                    description TEXT,
+                    category TEXT
+                );
+                CREATE INDEX IF NOT EXISTS transactions_account_date ON transactions (account, date);
+                CREATE TABLE IF NOT EXISTS rules (
+                    account TEXT PRIMARY KEY,
+                    rules_hash TEXT NOT NULL
+                );
+                -- Running totals per account, month (YYYY-MM) and category, in cents, kept in step with transactions
+                CREATE TABLE IF NOT EXISTS monthly_totals (
+                    account TEXT NOT NULL,
+                    month TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    spent INTEGER NOT NULL,
+                    income INTEGER NOT NULL,
+                    net INTEGER NOT NULL,
+                    spent_count INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (account, month, category)
+                );
+            """)
+            if not has_totals:
+                # A store from before the totals table: compute it once from the transactions already there
+                with self.connection:
+                    self.connection.execute(f"INSERT INTO monthly_totals {TOTALS_FROM_TRANSACTIONS.format(where='')}")
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def new_rows(self, account, df, date_column):
+        # Return the rows of df whose ids are not in the store yet, with their ids in a txn_id column
+        connection = self.connect()
+        df = df.assign(txn_id=transaction_ids(df, date_column, account))
+        # Look the ids up through the primary key index instead of reading every stored id
+        with connection:
+            connection.execute("CREATE TEMP TABLE IF NOT EXISTS incoming (txn_id TEXT PRIMARY KEY)")
+            connection.execute("DELETE FROM incoming")
+            connection.executemany("INSERT OR IGNORE INTO incoming VALUES (?)", ((txn_id,) for txn_id in df['txn_id']))
+            seen = {row[0] for row in connection.execute(
+                "SELECT incoming.txn_id FROM incoming JOIN transactions ON transactions.txn_id = incoming.txn_id")}
+        return df[~df['txn_id'].isin(seen)]
+
+    def append(self, account, df, date_column):
+        # Add categorized rows returned by new_rows to the store and fold them into its monthly totals,
+        # in one transaction so the two never disagree
+        rows = zip(df['txn_id'], [account] * len(df), df[date_column].dt.strftime('%Y-%m-%d'),
+                   to_dollars(df[CENTS_COLUMN]), df['Description'].astype(object), df['Category'].astype(object))
+        totals = monthly_category_totals(df, date_column)
+        totals_rows = ((account, str(month), category, *map(int, values))
+                       for (month, category), values in zip(totals.index, totals[TOTAL_COLUMNS].to_numpy()))
+        with self.connect() as connection:
+            connection.executemany("INSERT OR IGNORE INTO transactions VALUES (?, ?, ?, ?, ?, ?)", rows)
+            connection.executemany("""
+                INSERT INTO monthly_totals VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (account, month, category) DO UPDATE SET
+                    spent = spent + excluded.spent, income = income + excluded.income, net = net + excluded.net,
+                    spent_count = spent_count + excluded.spent_count, count = count + excluded.count
+            """, totals_rows)
+
+    def load_totals(self, account):
+        # Monthly totals of every stored transaction of an account, indexed by (YearMonth, Category), in cents.
+        # Only months x categories in size, however long the history is.
+        df = pd.read_sql_query(f"SELECT month, category, {', '.join(TOTAL_COLUMNS)} FROM monthly_totals WHERE account = ?",
+                               self.connect(), params=(account,))
+        if df.empty:
+            return empty_totals()
+        index = pd.MultiIndex.from_arrays([pd.PeriodIndex(df['month'], freq='M'), df['category'].to_numpy(dtype=object)],
+                                          names=['YearMonth', 'Category'])
+        return pd.DataFrame(df[TOTAL_COLUMNS].to_numpy(dtype='int64'), index=index, columns=TOTAL_COLUMNS).sort_index()
+
+    def rebuild_totals(self, account):
+        # Recompute an account's monthly totals from its transactions, after their categories were rewritten
+        with self.connect() as connection:
+            connection.execute("DELETE FROM monthly_totals WHERE account = ?", (account,))
+            connection.execute(f"INSERT INTO monthly_totals {TOTALS_FROM_TRANSACTIONS.format(where='WHERE account = ?')}", (account,))
+
+    def load(self, account, date_column):
+        # Read every stored transaction for an account, in the same columns the trackers use (Amount in dollars)
+        df = pd.read_sql_query(
+            "SELECT txn_id, date, amount, description, category FROM transactions WHERE account = ? ORDER BY date",
+            self.connect(), params=(account,))
+        df.columns = ['txn_id', date_column, 'Amount', 'Description', 'Category']
+        df[date_column] = pd.to_datetime(df[date_column], format='%Y-%m-%d')
+        return df
+
+    def rules_hash(self, account):
+        # Hash of the categories the stored categories for an account were computed with
+        row = self.connect().execute("SELECT rules_hash FROM rules WHERE account = ?", (account,)).fetchone()
+        return row[0] if row else None
+
+    def set_rules_hash(self, account, rules_hash):
+        with self.connect() as connection:
+            connection.execute("INSERT OR REPLACE INTO rules VALUES (?, ?)", (account, rules_hash))
+
+    def descriptions(self, account):
+        # All stored (txn_id, description) pairs for an account, for re-categorizing after a rule change
+        return pd.read_sql_query("SELECT txn_id, description FROM transactions WHERE account = ?",
+                                 self.connect(), params=(account,))
+
+    def update_categories(self, txn_ids, categories):
+        # Overwrite the category of the given transactions
+        with self.connect() as connection:
+            connection.executemany("UPDATE transactions SET category = ? WHERE txn_id = ?", zip(categories, txn_ids))
@@ -0,0 +1,159 @@
+"""Watch mode: poll an inbox directory and fold every new or changed statement export into running totals."""
+
+import os
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+import pandas as pd
+from trackers.aggregation import MonthlyReport, MonthlyTotalsAccumulator, totals_in_dollars
+from trackers.batch import process_file
+from trackers.transaction_store import transaction_ids
+
+SETTLE_SECONDS = 2.0  # A file must keep the same size and modification time this long before it is read
+POLL_SECONDS = 1.0  # How often the directory is scanned
+
+
+def file_signature(path):
+    # (size, modification time) of a file, or None if it is gone
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def ignore_interrupts():
+    # Worker initializer: Ctrl+C is handled by the watcher, which shuts the pool down itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class InboxWatcher:
+    def __init__(self, directory, workers=None, settle_seconds=SETTLE_SECONDS, export_dir=None):
+        self.directory = Path(directory)
+        self.workers = workers  # Worker processes (default: one per CPU core)
+        self.settle_seconds = settle_seconds
+        self.export_dir = export_dir  # When set, every processed file's report is exported there too
+        self.seen = {}  # Path -> (signature, time it was first seen with that signature), while a file settles
+        self.processed = {}  # Path -> signature it was last processed with
+        self.pending = {}  # Future -> (path, signature) of files being processed
+        # Every transaction is counted once however many exports contain it: ids are reference counted
+        # across files, and only a row whose count goes from 0 to 1 (or back) changes the totals
+        self.file_rows = {}  # Path -> (account, rows it contributed, with their txn_id)
+        self.id_counts = {}  # txn_id -> number of processed files containing it
+        self.accumulators = {}  # Account -> MonthlyTotalsAccumulator of its counted transactions
+        self.touched = set()  # Months whose totals changed since the last report
+
+    def ready_files(self, now):
+        # CSV files that are new or changed since they were processed and have stopped changing.
+        # Whatever their name: the worker tells the account from the file's contents.
+        ready = []
+        for path in sorted(self.directory.glob('*.csv')):
+            signature = file_signature(path)
+            if signature is None or signature[0] == 0 or signature == self.processed.get(path):
+                continue
+            if any(path == pending_path for pending_path, _ in self.pending.values()):
+                continue  # Picked up again after the current run if it changed meanwhile
+            previous = self.seen.get(path)
+            if previous is None or previous[0] != signature:
+                self.seen[path] = (signature, now)  # Still being written, or just arrived: start the settle clock
+            elif now - previous[1] >= self.settle_seconds:
+                ready.append((path, signature))
+        return ready
+
+    def removed_files(self):
+        # Processed files that have disappeared from the inbox
+        return [path for path in self.file_rows if not path.exists()]
+
+    def apply(self, path, account, rows):
+        # Replace a file's contribution to the totals with its new rows (None when the file is gone)
+        old_account, old_rows = self.file_rows.pop(path, (account, None))
+        counts = self.id_counts
+        if old_rows is not None:
+            for txn_id in old_rows['txn_id']:
+                counts[txn_id] -= 1
+            released = [counts[txn_id] == 0 for txn_id in old_rows['txn_id']]  # Rows no other export still holds
+            for txn_id in old_rows['txn_id'][released]:
+                del counts[txn_id]
+            self.accumulators[old_account].subtract(old_rows[released], 'Date')
+            self.touched.update(old_rows['Date'][released].dt.to_period('M').unique())
+        if rows is None:
+            return 0
+        new = [txn_id not in counts for txn_id in rows['txn_id']]  # Rows no other export has counted yet
+        for txn_id in rows['txn_id']:
+            counts[txn_id] = counts.get(txn_id, 0) + 1
+        self.accumulators.setdefault(account, MonthlyTotalsAccumulator()).add(rows[new], 'Date')
+        self.touched.update(rows['Date'][new].dt.to_period('M').unique())
+        self.file_rows[path] = (account, rows)
+        return sum(new)
+
+    def totals(self):
+        # Current totals of every account, indexed by (account, YearMonth, Category), in cents
+        frames = {account: accumulator.result() for account, accumulator in sorted(self.accumulators.items())}
+        return pd.concat(frames, names=['account']) if frames else None
+
+    def report(self):
+        # Combined monthly report of all accounts
+        totals = self.totals()
+        return None if totals is None else MonthlyReport(totals.groupby(level=['YearMonth', 'Category']).sum())
+
+    def handle_result(self, path, signature, result):
+        # Fold one finished file into the totals and say what happened
+        _, account, _, rows, seconds, error, _, transactions = result
+        if error is not None:
+            self.processed[path] = signature  # Not retried until the file changes again
+            print(f"{path.name} ({account or 'unknown'}): {error}")
+            return
+        transactions = transactions.assign(txn_id=transaction_ids(transactions, 'Date', account))
+        added = self.apply(path, account, transactions)
+        self.processed[path] = signature
+        print(f"{path.name} ({account}): {rows:,} rows in {seconds:.2f} s ({rows - added:,} already counted from other exports)")
+
+    def poll(self, pool, now=None):
+        # One round: collect finished files, drop removed ones and submit files that have settled.
+        # Returns whether the totals changed.
+        now = time.monotonic() if now is None else now
+        changed = False
+        done = [future for future in self.pending if future.done()]
+        for future in done:
+            path, signature = self.pending.pop(future)
+            self.handle_result(path, signature, future.result())
+            changed = True
+        for path in self.removed_files():
+            self.apply(path, None, None)
+            self.processed.pop(path, None)
+            print(f"{path.name}: removed, its transactions are taken out of the totals")
+            changed = True
+        for path, signature in self.ready_files(now):
+            future = pool.submit(process_file, str(path), False, self.export_dir)
+            self.pending[future] = (path, signature)
+        return changed
+
+    def print_report(self, output=None):
+        # Print the combined totals of the months that changed and write the per-account totals (in dollars) to output
+        report = self.report()
+        if report is None:
+            return
+        print("All accounts, changed months:")
+        for name, month in zip(report.months.index, report.months.itertuples()):
+            if name in self.touched:
+                print(f"    {name}: spent ${month.spent:.2f}, income ${month.income:.2f}")
+        self.touched.clear()
+        if output is not None:
+            totals_in_dollars(self.totals()).to_csv(output)
+            print(f"Totals written to {output}")
+
+    def run(self, output=None, poll_seconds=POLL_SECONDS):
+        # Watch until interrupted (Ctrl+C), reporting whenever the totals change
+        print(f"Watching {self.directory} for statement exports (Ctrl+C to stop)...")
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=ignore_interrupts) as pool:
+            try:
+                while True:
+                    if self.poll(pool):
+                        self.print_report(output)
+                    if self.pending:
+                        wait(list(self.pending), timeout=poll_seconds, return_when=FIRST_COMPLETED)
+                    else:
+                        time.sleep(poll_seconds)
+            except KeyboardInterrupt:
+                print("Stopped watching.")